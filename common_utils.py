@@ -3,16 +3,33 @@ Common utilities for agentic-pm project.
 Provides shared functionality for database connections, Vault secrets, API clients, and agents.
 """
 import os
+import atexit
+import hashlib
+import json
 import logging
-import hvac
+import re
+import sqlite3
+import threading
+import time
 import psycopg2
-from typing import Dict, Any, Optional
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from psycopg2.extras import execute_values
+from psycopg2.pool import ThreadedConnectionPool
+from typing import TYPE_CHECKING, Callable, Dict, Any, Iterable, Iterator, List, Optional, Type, Union
 from dotenv import load_dotenv
-from connectors.confluenceapi import ConfluenceApi
-from connectors.jirapi import JiraApi
-from jinja2 import Environment, FileSystemLoader
-from strands import Agent
-from strands.models.ollama import OllamaModel
+
+# Vault, HTTP clients, Jinja and strands are imported on first use so that
+# importing a flow module (for --help, tests or the tool registry) stays fast
+if TYPE_CHECKING:
+    import hvac
+    from connectors.confluenceapi import AsyncConfluenceApi, ConfluenceApi
+    from connectors.jirapi import AsyncJiraApi, JiraApi
+    from jinja2 import Environment
+    from pydantic import BaseModel
+    from strands import Agent
+    from strands.models.ollama import OllamaModel
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -22,110 +39,631 @@ OLLAMA_HOST = "http://localhost:11434"
 OLLAMA_MODEL = "granite4"
 OLLAMA_TEMPERATURE = 0
 OLLAMA_MAX_TOKENS = 4096
+OLLAMA_CONTEXT_TOKENS = 16384  # num_ctx requested from Ollama
+OLLAMA_TOKENIZER = os.getenv("OLLAMA_TOKENIZER")  # optional path to the model's tokenizer.json
+CHUNK_CONTEXT_FRACTION = 0.5  # share of the remaining prompt budget filled by one chunk
+CHUNK_PROMPT_RESERVE = 1024  # tokens reserved for system prompt and instructions
+JIRA_PAGE_SIZE = 100  # issues requested per Jira search page
+JIRA_MAX_CONCURRENT_REQUESTS = 4  # parallel page prefetch, keep below Jira rate limits
+DB_POOL_MIN_CONNECTIONS = 1
+DB_POOL_MAX_CONNECTIONS = 8
+DB_POOL_HEALTH_CHECK_INTERVAL = 60  # seconds a pooled connection may idle before it is pinged
+BATCH_WRITER_MAX_ROWS = 100
+BATCH_WRITER_MAX_DELAY = 5.0  # seconds
+BATCH_WRITER_CLOSE_RETRIES = 3  # retries of the final flush, with exponential backoff
+LLM_CACHE_BACKEND = "sqlite"  # "sqlite", "postgres" or None to disable
+LLM_CACHE_PATH = os.path.join(".cache", "llm_responses.sqlite3")
+LLM_CACHE_TTL = 30 * 24 * 3600  # seconds
+LLM_CACHE_MAX_ENTRIES = 50000
+LLM_CACHE_EVICT_EVERY = 500  # writes between eviction passes
+# In-flight LLM requests per process across all worker pools, 0 leaves concurrency to the
+# workers/parallelism settings of the flows; --llm-concurrency overrides it
+LLM_MAX_CONCURRENCY = int(os.getenv('LLM_MAX_CONCURRENCY', 0))
+SUMMARY_MAX_WORKERS = 4  # parallel chunk summaries per tree-summarize level
+VAULT_SECRET_TTL = 900  # seconds a secret is reused before it is read again
+VAULT_SECRET_GRACE = 3600  # seconds an expired secret is still served while Vault cannot be read
+VAULT_RETRY_INTERVAL = 30  # seconds between reads of a secret served from the grace period
+VAULT_TOKEN_RENEW_MARGIN = 300  # renew the Vault token this many seconds before it expires
+
+# System prompts
+SCRUM_SYSTEM_PROMPT = """
+                You are scrum master managing project team for which you need to report various information from Jira backlog to project manager. Your project is agile project with 2 weeks sprints and follows the standard flow of design, architecture,build and so on.
+            """
+PM_SYSTEM_PROMPT = """
+                You are project manager who has to report executive summaries about project status to management board. Your project is agile project with 2 weeks sprints and follows the standard flow of design, architecture,build and so on. You get information from scrum master which you have to transform to high level summary for final report.
+            """
+SYSTEM_PROMPTS = {'scrum': SCRUM_SYSTEM_PROMPT, 'pm': PM_SYSTEM_PROMPT}
+
+TEMPLATES_DIR = 'templates'
 
-# Jinja2 environment
-jinja_env = Environment(loader=FileSystemLoader('templates'))
+
+class SecretFileCache:
+    """
+    Encrypted file sharing a Vault token and secrets between processes.
+    
+    The file is encrypted with a Fernet key and only readable by its owner.
+    Callers hold an exclusive file lock while they read and update it, so
+    concurrent processes perform a single login and a single read per secret.
+    """
+    
+    def __init__(self, path: str, key: str):
+        """
+        Initialize cache file.
+        
+        Args:
+            path: Path of the encrypted cache file
+            key: Fernet key used to encrypt the file
+        """
+        from cryptography.fernet import Fernet
+        self.path = path
+        self.fernet = Fernet(key)
+    
+    @contextmanager
+    def locked(self) -> Iterator[None]:
+        """Hold an exclusive lock on the cache file for the duration of a with-block."""
+        import fcntl
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(f"{self.path}.lock", 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+    
+    def load(self) -> Dict[str, Any]:
+        """Return the cached state, empty if the file is missing or unreadable."""
+        from cryptography.fernet import InvalidToken
+        try:
+            with open(self.path, 'rb') as f:
+                return json.loads(self.fernet.decrypt(f.read()))
+        except FileNotFoundError:
+            return {}
+        except (InvalidToken, ValueError) as e:
+            logger.warning(f"Ignoring unreadable Vault cache file {self.path}: {e}")
+            return {}
+    
+    def save(self, state: Dict[str, Any]) -> None:
+        """Atomically replace the cached state."""
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(self.fernet.encrypt(json.dumps(state).encode('utf-8')))
+        os.replace(tmp_path, self.path)
 
 
 class ConfigManager:
-    """Manages configuration from Vault and environment variables."""
+    """
+    Manages configuration from Vault and environment variables.
+    
+    Secrets are cached in memory for secret_ttl seconds (or their lease, if
+    shorter). If Vault cannot be read when a secret expired, the cached value
+    is served for up to secret_grace more seconds and the read retried every
+    VAULT_RETRY_INTERVAL seconds. The Vault token is renewed, or the AppRole
+    login repeated, when it gets close to expiry. With VAULT_CACHE_FILE and VAULT_CACHE_KEY set,
+    token and secrets are also shared between processes through an encrypted
+    file, so concurrently started flows log in once.
+    """
     
-    def __init__(self):
-        """Initialize configuration manager and load environment variables."""
+    def __init__(
+        self,
+        secret_ttl: float = VAULT_SECRET_TTL,
+        secret_grace: float = VAULT_SECRET_GRACE,
+        cache_file: Optional[str] = None,
+        cache_key: Optional[str] = None
+    ):
+        """
+        Initialize configuration manager and load environment variables.
+        
+        Args:
+            secret_ttl: Seconds a secret is reused before it is read again
+            secret_grace: Seconds an expired secret is still used while Vault fails
+            cache_file: Optional shared cache file, defaults to VAULT_CACHE_FILE
+            cache_key: Fernet key of the cache file, defaults to VAULT_CACHE_KEY
+        """
         load_dotenv()
+        self.secret_ttl = secret_ttl
+        self.secret_grace = secret_grace
         self._vault_client = None
-        self._db_config = None
-        self._jira_config = None
-        self._confluence_config = None
-        self._llm_config = None
-        
-    def _get_vault_client(self) -> hvac.Client:
-        """Get or create Vault client."""
-        if self._vault_client is None:
-            logger.info("Initializing Vault client")
-            self._vault_client = hvac.Client(url=os.getenv('VAULT_URL'))
-            self._vault_client.auth.approle.login(
-                role_id=os.getenv('VAULT_ROLE_ID'),
-                secret_id=os.getenv('VAULT_SECRET_ID'),
-            )
-            logger.info("Successfully authenticated with Vault")
-        return self._vault_client
+        self._token_expires = 0.0
+        self._token_renewable = False
+        self._secrets = {}
+        # path -> time until which a secret that failed to refresh is still served
+        self._stale_until = {}
+        self._lock = threading.RLock()
+        
+        cache_file = cache_file or os.getenv('VAULT_CACHE_FILE')
+        cache_key = cache_key or os.getenv('VAULT_CACHE_KEY')
+        self._file_cache = None
+        if cache_file and cache_key:
+            self._file_cache = SecretFileCache(cache_file, cache_key)
+        elif cache_file:
+            logger.warning("VAULT_CACHE_FILE is set without VAULT_CACHE_KEY, not sharing Vault secrets")
+    
+    def _authenticate(self) -> None:
+        """Renew the Vault token if possible, otherwise log in with AppRole."""
+        client = self._vault_client
+        if client.token and self._token_renewable and time.time() < self._token_expires:
+            try:
+                response = client.auth.token.renew_self()
+                self._set_token_lease(response['auth'])
+                logger.info("Renewed Vault token")
+                return
+            except Exception as e:
+                logger.warning(f"Vault token renewal failed, logging in again: {e}")
+        response = client.auth.approle.login(
+            role_id=os.getenv('VAULT_ROLE_ID'),
+            secret_id=os.getenv('VAULT_SECRET_ID'),
+        )
+        self._set_token_lease(response['auth'])
+        logger.info("Successfully authenticated with Vault")
+    
+    def _set_token_lease(self, auth: Dict[str, Any]) -> None:
+        lease = auth.get('lease_duration') or 0
+        # Tokens without a lease do not expire
+        self._token_expires = time.time() + lease if lease else float('inf')
+        self._token_renewable = bool(auth.get('renewable'))
+    
+    def _get_vault_client(self, state: Optional[Dict[str, Any]] = None) -> 'hvac.Client':
+        """
+        Get a Vault client with a token that is valid for a while.
+        
+        Args:
+            state: Shared cache file state, read and updated while locked
+        """
+        with self._lock:
+            if self._vault_client is None:
+                import hvac
+                logger.info("Initializing Vault client")
+                self._vault_client = hvac.Client(url=os.getenv('VAULT_URL'))
+            
+            if state is not None and state.get('token_expires', 0) > self._token_expires:
+                # Another process already logged in
+                self._vault_client.token = state['token']
+                self._token_expires = state['token_expires']
+                self._token_renewable = state.get('token_renewable', False)
+            
+            if time.time() >= self._token_expires - VAULT_TOKEN_RENEW_MARGIN:
+                self._authenticate()
+                if state is not None:
+                    state['token'] = self._vault_client.token
+                    state['token_expires'] = self._token_expires
+                    state['token_renewable'] = self._token_renewable
+            return self._vault_client
+    
+    def _fetch_secret(self, path: str, state: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Read a secret from the shared state or Vault and cache it."""
+        now = time.time()
+        entry = state.get('secrets', {}).get(path) if state is not None else None
+        if entry is None or entry['expires'] <= now:
+            logger.info(f"Reading secret {path} from Vault")
+            client = self._get_vault_client(state)
+            secret = client.secrets.kv.read_secret_version(path=path)
+            lease = secret.get('lease_duration') or 0
+            entry = {'data': secret, 'expires': now + (min(self.secret_ttl, lease) if lease else self.secret_ttl)}
+            if state is not None:
+                state.setdefault('secrets', {})[path] = entry
+        self._secrets[path] = (entry['expires'], entry['data'])
+        self._stale_until.pop(path, None)
+        return entry['data']
+    
+    def read_secret(self, path: str) -> Dict[str, Any]:
+        """
+        Read a KV secret, reusing cached values until they expire.
+        
+        A failed refresh is logged and the expired value returned while it is
+        within the grace period; without a cached value, or after the grace
+        period, the error is raised.
+        
+        Args:
+            path: Secret path, e.g. 'secret/jira'
+            
+        Returns:
+            Secret response as returned by read_secret_version
+        """
+        with self._lock:
+            expires, secret = self._secrets.get(path, (0, None))
+            now = time.time()
+            if expires > now:
+                return secret
+            try:
+                return self._refresh_secret(path)
+            except Exception as e:
+                if secret is None:
+                    raise
+                stale_until = self._stale_until.setdefault(path, expires + self.secret_grace)
+                if now >= stale_until:
+                    raise
+                logger.warning(
+                    f"Failed to refresh secret {path}, using the cached value "
+                    f"for up to {stale_until - now:.0f}s: {e}"
+                )
+                self._secrets[path] = (min(now + VAULT_RETRY_INTERVAL, stale_until), secret)
+                return secret
+    
+    def _refresh_secret(self, path: str) -> Dict[str, Any]:
+        """Read a secret through the shared cache file, if configured, or from Vault."""
+        if self._file_cache is None:
+            return self._fetch_secret(path, None)
+        with self._file_cache.locked():
+            state = self._file_cache.load()
+            secret = self._fetch_secret(path, state)
+            self._file_cache.save(state)
+            return secret
+    
+    def invalidate(self, path: Optional[str] = None) -> None:
+        """Drop one cached secret, or all of them, from memory."""
+        with self._lock:
+            if path is None:
+                self._secrets.clear()
+                self._stale_until.clear()
+            else:
+                self._secrets.pop(path, None)
+                self._stale_until.pop(path, None)
     
     def get_db_config(self) -> Dict[str, str]:
         """Get database configuration from Vault."""
-        if self._db_config is None:
-            logger.info("Loading database configuration from Vault")
-            client = self._get_vault_client()
-            db_secret = client.secrets.kv.read_secret_version(path='secret/cmdb')
-            self._db_config = {
-                'dbname': db_secret['data']['data']['psql_db'],
-                'user': db_secret['data']['data']['psql_user'],
-                'password': db_secret['data']['data']['psql_pw'],
-                'host': db_secret['data']['data']['psql_host'],
-                'port': db_secret['data']['data']['psql_port'],
-            }
-            logger.info("Database configuration loaded successfully")
-        return self._db_config
+        db_secret = self.read_secret('secret/cmdb')
+        return {
+            'dbname': db_secret['data']['data']['psql_db'],
+            'user': db_secret['data']['data']['psql_user'],
+            'password': db_secret['data']['data']['psql_pw'],
+            'host': db_secret['data']['data']['psql_host'],
+            'port': db_secret['data']['data']['psql_port'],
+        }
     
     def get_jira_config(self) -> Dict[str, str]:
         """Get Jira configuration from Vault."""
-        if self._jira_config is None:
-            logger.info("Loading Jira configuration from Vault")
-            client = self._get_vault_client()
-            jira_secret = client.secrets.kv.read_secret_version(path='secret/jira')
-            self._jira_config = {
-                'url': jira_secret['data']['data']['url'],
-                'token': jira_secret['data']['data']['token'],
-            }
-            logger.info("Jira configuration loaded successfully")
-        return self._jira_config
+        jira_secret = self.read_secret('secret/jira')
+        return {
+            'url': jira_secret['data']['data']['url'],
+            'token': jira_secret['data']['data']['token'],
+        }
     
     def get_confluence_config(self) -> Dict[str, str]:
         """Get Confluence configuration from Vault."""
-        if self._confluence_config is None:
-            logger.info("Loading Confluence configuration from Vault")
-            client = self._get_vault_client()
-            confluence_secret = client.secrets.kv.read_secret_version(path='secret/confluence')
-            self._confluence_config = {
-                'url': confluence_secret['data']['data']['url'],
-                'token': confluence_secret['data']['data']['token'],
-            }
-            logger.info("Confluence configuration loaded successfully")
-        return self._confluence_config
+        confluence_secret = self.read_secret('secret/confluence')
+        return {
+            'url': confluence_secret['data']['data']['url'],
+            'token': confluence_secret['data']['data']['token'],
+        }
     
     def get_llm_config(self) -> Dict[str, Any]:
         """Get LLM configuration from Vault."""
-        if self._llm_config is None:
-            logger.info("Loading LLM configuration from Vault")
-            client = self._get_vault_client()
-            self._llm_config = client.secrets.kv.read_secret_version(path='secret/llm')
-            logger.info("LLM configuration loaded successfully")
-        return self._llm_config
+        return self.read_secret('secret/llm')
 
 
 class DatabaseManager:
     """Manages database connections and operations."""
     
-    def __init__(self, config_manager: ConfigManager):
-        """Initialize database manager with configuration."""
-        self.config = config_manager.get_db_config()
-        logger.info("Database manager initialized")
+    def __init__(
+        self,
+        config_manager: ConfigManager,
+        pooled: bool = False,
+        min_connections: int = DB_POOL_MIN_CONNECTIONS,
+        max_connections: int = DB_POOL_MAX_CONNECTIONS
+    ):
+        """
+        Initialize database manager with configuration.
+        
+        Args:
+            config_manager: Configuration manager providing database settings
+            pooled: If True, reuse connections from a thread-safe pool instead
+                of opening a new connection for every statement
+            min_connections: Connections kept open by the pool
+            max_connections: Upper bound of concurrently open connections
+        """
+        self.config_manager = config_manager
+        self._config = None
+        self.pooled = pooled
+        self.min_connections = min_connections
+        self.max_connections = max_connections
+        self._pool = None
+        self._pool_config = None
+        # pool -> checked out connections, pools replaced after a settings change are
+        # closed once their last connection is returned
+        self._checkouts = defaultdict(int)
+        self._retired_pools = set()
+        self._pool_lock = threading.Lock()
+        self._config_lock = threading.Lock()
+        self._pool_slots = threading.BoundedSemaphore(max_connections)
+        self._last_used = {}
+        logger.info(f"Database manager initialized (pooled={pooled})")
+    
+    @property
+    def config(self) -> Dict[str, str]:
+        """Database settings, re-read from Vault whenever the cached secret expired."""
+        # Serialized, so the last settings stored are the latest ones read
+        with self._config_lock:
+            config = self.config_manager.get_db_config()
+            if self._config is not None and config != self._config:
+                logger.info("Database settings changed")
+            self._config = config
+            return config
     
     def get_connection(self):
         """Get a database connection."""
         logger.debug("Creating database connection")
         return psycopg2.connect(**self.config)
     
+    def _get_pool(self) -> ThreadedConnectionPool:
+        """
+        Get or create the connection pool and count a checkout on it.
+        
+        The pool is replaced when the database settings changed, e.g. after
+        a password rotation; connections of the old pool stay usable until
+        they are returned. Every call must be paired with _release_pool.
+        The settings are those of the last config read, so Vault is never
+        called while holding the pool lock.
+        """
+        with self._pool_lock:
+            config = self._config
+            if self._pool is not None and config != self._pool_config:
+                logger.info("Replacing database connection pool with new settings")
+                self._retire_pool(self._pool)
+                self._pool = None
+            if self._pool is None:
+                logger.info(
+                    f"Creating database connection pool "
+                    f"({self.min_connections}-{self.max_connections} connections)"
+                )
+                self._pool = ThreadedConnectionPool(
+                    self.min_connections,
+                    self.max_connections,
+                    **config
+                )
+                self._pool_config = config
+            self._checkouts[self._pool] += 1
+            return self._pool
+    
+    def _retire_pool(self, pool: ThreadedConnectionPool) -> None:
+        """Close a pool now if it is idle, otherwise when its last connection is returned."""
+        if self._checkouts.get(pool):
+            self._retired_pools.add(pool)
+        else:
+            self._checkouts.pop(pool, None)
+            pool.closeall()
+    
+    def _release_pool(self, pool: ThreadedConnectionPool) -> None:
+        """Count a returned checkout, closing the pool if it was retired meanwhile."""
+        with self._pool_lock:
+            self._checkouts[pool] -= 1
+            if self._checkouts[pool] <= 0 and pool in self._retired_pools:
+                self._retired_pools.discard(pool)
+                self._checkouts.pop(pool, None)
+                pool.closeall()
+    
+    def _is_healthy(self, conn) -> bool:
+        """
+        Switch a pooled connection to autocommit and check that it is still usable.
+        
+        Connections that were never checked out, or were used within
+        DB_POOL_HEALTH_CHECK_INTERVAL, are not pinged.
+        """
+        if conn.closed:
+            return False
+        try:
+            # Before the ping, which would otherwise open a transaction
+            if not conn.autocommit:
+                conn.set_session(autocommit=True)
+            last_used = self._last_used.get(id(conn))
+            if last_used is None or time.monotonic() - last_used < DB_POOL_HEALTH_CHECK_INTERVAL:
+                return True
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            if not conn.autocommit:
+                conn.rollback()
+            return True
+        except psycopg2.Error as e:
+            logger.warning(f"Discarding unhealthy database connection: {e}")
+            return False
+    
+    @contextmanager
+    def connection(self):
+        """
+        Provide an autocommit connection for the duration of a with-block.
+        
+        In pooled mode the connection is checked out of the pool, health
+        checked and returned afterwards; callers block while all connections
+        are in use. Otherwise a dedicated connection is opened and closed.
+        """
+        if not self.pooled:
+            conn = self.get_connection()
+            try:
+                conn.set_session(autocommit=True)
+                yield conn
+            finally:
+                conn.close()
+            return
+        
+        # May read Vault, so before taking a pool slot or the pool lock
+        self.config
+        with self._pool_slots:
+            pool = self._get_pool()
+            try:
+                conn = pool.getconn()
+                while not self._is_healthy(conn):
+                    self._last_used.pop(id(conn), None)
+                    pool.putconn(conn, close=True)
+                    conn = pool.getconn()
+                broken = False
+                try:
+                    yield conn
+                except (psycopg2.OperationalError, psycopg2.InterfaceError):
+                    broken = True
+                    raise
+                finally:
+                    if broken or conn.closed:
+                        self._last_used.pop(id(conn), None)
+                        pool.putconn(conn, close=True)
+                    else:
+                        self._last_used[id(conn)] = time.monotonic()
+                        pool.putconn(conn)
+            finally:
+                self._release_pool(pool)
+    
     def execute_query(self, query: str, params: tuple = None, fetch: bool = True):
         """Execute a database query."""
         logger.debug(f"Executing query: {query[:100]}...")
-        with self.get_connection() as conn:
-            conn.set_session(autocommit=True)
+        with self.connection() as conn:
             with conn.cursor() as cursor:
                 cursor.execute(query, params)
                 if fetch:
                     return cursor.fetchall()
                 return None
+    
+    def execute_values(self, query: str, rows: list, template: str = None, page_size: int = BATCH_WRITER_MAX_ROWS) -> None:
+        """
+        Execute a statement with a multi-row VALUES list.
+        
+        Args:
+            query: Statement containing a single %s placeholder for the VALUES list
+            rows: Sequence of row tuples
+            template: Optional row template, e.g. "(%s, %s::jsonb)"
+            page_size: Maximum number of rows sent per statement
+        """
+        logger.debug(f"Executing batch of {len(rows)} rows: {query[:100]}...")
+        with self.connection() as conn:
+            with conn.cursor() as cursor:
+                execute_values(cursor, query, rows, template=template, page_size=page_size)
+    
+    def close(self) -> None:
+        """Close all pooled connections."""
+        with self._pool_lock:
+            if self._pool is not None:
+                logger.info("Closing database connection pool")
+                self._pool.closeall()
+                self._pool = None
+                self._last_used.clear()
+            for pool in self._retired_pools:
+                pool.closeall()
+            self._retired_pools.clear()
+            self._checkouts.clear()
+
+
+class BatchWriter:
+    """
+    Buffers rows and writes them with multi-row statements.
+    
+    Rows are flushed when max_rows are buffered, every max_delay seconds and
+    when the writer is closed (also at interpreter exit). Rows with the same
+    key are merged, last write wins, so one statement never touches a row twice.
+    """
+    
+    def __init__(
+        self,
+        db_manager: DatabaseManager,
+        query: str,
+        key_func: Callable[[tuple], Any],
+        template: str = None,
+        max_rows: int = BATCH_WRITER_MAX_ROWS,
+        max_delay: float = BATCH_WRITER_MAX_DELAY,
+        on_flush: Optional[Callable[[List[tuple]], None]] = None
+    ):
+        """
+        Initialize batch writer and start its flush timer.
+        
+        Args:
+            db_manager: Database manager used for writing
+            query: Statement with a single %s placeholder for the VALUES list
+            key_func: Returns the identity of a row used for merging
+            template: Optional row template passed to execute_values
+            max_rows: Number of buffered rows that triggers a flush
+            max_delay: Maximum seconds a row stays buffered
+            on_flush: Optional callback receiving the rows of every successful write
+        """
+        self.db_manager = db_manager
+        self.query = query
+        self.key_func = key_func
+        self.template = template
+        self.on_flush = on_flush
+        self.max_rows = max_rows
+        self.max_delay = max_delay
+        self._rows = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._closed = threading.Event()
+        self._timer = threading.Thread(target=self._run_timer, name="batch-writer", daemon=True)
+        self._timer.start()
+        atexit.register(self.close)
+    
+    def add(self, row: tuple) -> None:
+        """Buffer a row, flushing if the buffer is full."""
+        with self._lock:
+            self._rows[self.key_func(row)] = row
+            full = len(self._rows) >= self.max_rows
+        if full:
+            try:
+                self.flush()
+            except Exception as e:
+                # Rows stay buffered and are retried by the next flush
+                logger.error(f"Batch flush failed, will retry: {e}")
+    
+    def flush(self) -> int:
+        """
+        Write all buffered rows.
+        
+        Returns:
+            Number of rows written
+            
+        Raises:
+            Exception: If the write fails; the rows are kept for the next flush
+        """
+        with self._flush_lock:
+            with self._lock:
+                rows, self._rows = self._rows, {}
+            if not rows:
+                return 0
+            try:
+                self.db_manager.execute_values(self.query, list(rows.values()), template=self.template)
+            except Exception:
+                with self._lock:
+                    for key, row in rows.items():
+                        # Newer rows buffered meanwhile take precedence
+                        self._rows.setdefault(key, row)
+                raise
+            logger.debug(f"Flushed {len(rows)} buffered rows")
+            if self.on_flush is not None:
+                self.on_flush(list(rows.values()))
+            return len(rows)
+    
+    def _run_timer(self) -> None:
+        """Flush periodically until the writer is closed."""
+        while not self._closed.wait(self.max_delay):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Timed batch flush failed, will retry: {e}")
+    
+    def close(self) -> None:
+        """
+        Stop the flush timer and write remaining rows.
+        
+        The final flush is retried BATCH_WRITER_CLOSE_RETRIES times. If it
+        still fails the rows stay buffered and the exception is raised; a
+        later close, at the latest the one at interpreter exit, tries again.
+        """
+        if not self._closed.is_set():
+            self._closed.set()
+            self._timer.join()
+        for attempt in range(BATCH_WRITER_CLOSE_RETRIES + 1):
+            try:
+                self.flush()
+                break
+            except Exception as e:
+                if attempt == BATCH_WRITER_CLOSE_RETRIES:
+                    logger.error(f"Final batch flush failed, {len(self._rows)} rows not written: {e}")
+                    raise
+                logger.warning(f"Final batch flush failed, retrying: {e}")
+                time.sleep(2 ** attempt)
+        atexit.unregister(self.close)
+    
+    def __enter__(self) -> "BatchWriter":
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
 
 
 class APIClientManager:
@@ -136,35 +674,153 @@ class APIClientManager:
         self.config_manager = config_manager
         self._jira_api = None
         self._confluence_api = None
+        # Clients are shared by worker threads, create each one once
+        self._lock = threading.Lock()
         logger.info("API client manager initialized")
     
-    def get_jira_api(self) -> JiraApi:
-        """Get or create Jira API client."""
-        if self._jira_api is None:
-            logger.info("Initializing Jira API client")
+    def get_jira_api(self) -> 'JiraApi':
+        """
+        Get or create Jira API client.
+        
+        The settings are re-read whenever the cached secret expired: a new
+        token is applied to the existing client, a new URL replaces it.
+        """
+        with self._lock:
             config = self.config_manager.get_jira_config()
-            self._jira_api = JiraApi(
-                hostname=config['url'],
-                auth_token=config['token']
-            )
-            logger.info("Jira API client initialized successfully")
-        return self._jira_api
+            if self._jira_api is not None and self._jira_api.hostname != config['url']:
+                logger.info("Jira URL changed, replacing API client")
+                self._jira_api = None
+            if self._jira_api is None:
+                from connectors.jirapi import JiraApi
+                logger.info("Initializing Jira API client")
+                self._jira_api = JiraApi(
+                    hostname=config['url'],
+                    auth_token=config['token'],
+                    max_concurrent_requests=JIRA_MAX_CONCURRENT_REQUESTS
+                )
+                logger.info("Jira API client initialized successfully")
+            elif self._jira_api.auth_token != config['token']:
+                logger.info("Jira token changed, updating API client")
+                self._jira_api.set_auth_token(config['token'])
+            return self._jira_api
     
-    def get_confluence_api(self) -> ConfluenceApi:
-        """Get or create Confluence API client."""
-        if self._confluence_api is None:
-            logger.info("Initializing Confluence API client")
+    def get_confluence_api(self) -> 'ConfluenceApi':
+        """
+        Get or create Confluence API client.
+        
+        See get_jira_api; a token change keeps the client's published-page
+        digests and version cache.
+        """
+        with self._lock:
             config = self.config_manager.get_confluence_config()
-            self._confluence_api = ConfluenceApi(
-                hostname=config['url'],
-                auth_token=config['token']
-            )
-            logger.info("Confluence API client initialized successfully")
-        return self._confluence_api
+            if self._confluence_api is not None and self._confluence_api.hostname != config['url']:
+                logger.info("Confluence URL changed, replacing API client")
+                self._confluence_api = None
+            if self._confluence_api is None:
+                from connectors.confluenceapi import ConfluenceApi
+                logger.info("Initializing Confluence API client")
+                self._confluence_api = ConfluenceApi(
+                    hostname=config['url'],
+                    auth_token=config['token']
+                )
+                logger.info("Confluence API client initialized successfully")
+            elif self._confluence_api.auth_token != config['token']:
+                logger.info("Confluence token changed, updating API client")
+                self._confluence_api.set_auth_token(config['token'])
+            return self._confluence_api
+    
+    def create_async_jira_api(self) -> 'AsyncJiraApi':
+        """
+        Create an async Jira API client.
+        
+        Async clients are bound to the event loop they are used in, so every
+        call returns a new client; close it with aclose or use it as an async
+        context manager.
+        """
+        from connectors.jirapi import AsyncJiraApi
+        config = self.config_manager.get_jira_config()
+        return AsyncJiraApi(hostname=config['url'], auth_token=config['token'])
+    
+    def create_async_confluence_api(self) -> 'AsyncConfluenceApi':
+        """
+        Create an async Confluence API client.
+        
+        See create_async_jira_api.
+        """
+        from connectors.confluenceapi import AsyncConfluenceApi
+        config = self.config_manager.get_confluence_config()
+        return AsyncConfluenceApi(hostname=config['url'], auth_token=config['token'])
+    
+    def transport_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return request and retry counters of the initialized API clients."""
+        stats = {}
+        if self._jira_api is not None:
+            stats['jira'] = self._jira_api.session.stats()
+        if self._confluence_api is not None:
+            stats['confluence'] = self._confluence_api.session.stats()
+        return stats
+
+
+_config_manager = None
+_db_manager = None
+_api_manager = None
+_jinja_env = None
+_singletons_lock = threading.RLock()
+
+
+def get_config_manager() -> ConfigManager:
+    """Get the process-wide configuration manager."""
+    global _config_manager
+    with _singletons_lock:
+        if _config_manager is None:
+            _config_manager = ConfigManager()
+        return _config_manager
+
+
+def get_db_manager() -> DatabaseManager:
+    """
+    Get the process-wide pooled database manager.
+    
+    Vault is not contacted and no connection is opened until the first query.
+    """
+    global _db_manager
+    with _singletons_lock:
+        if _db_manager is None:
+            _db_manager = DatabaseManager(get_config_manager(), pooled=True)
+        return _db_manager
+
+
+def get_api_manager() -> APIClientManager:
+    """Get the process-wide API client manager."""
+    global _api_manager
+    with _singletons_lock:
+        if _api_manager is None:
+            _api_manager = APIClientManager(get_config_manager())
+        return _api_manager
+
+
+def get_jinja_env() -> 'Environment':
+    """Get the Jinja2 environment loading templates from TEMPLATES_DIR."""
+    global _jinja_env
+    with _singletons_lock:
+        if _jinja_env is None:
+            from jinja2 import Environment, FileSystemLoader
+            _jinja_env = Environment(loader=FileSystemLoader(TEMPLATES_DIR))
+        return _jinja_env
 
 
 class AgentFactory:
-    """Factory for creating AI agents."""
+    """
+    Factory for creating AI agents.
+    
+    Besides creating fresh agents it keeps a thread-safe pool of idle agents
+    keyed by role, model settings and tool limits. Pooled agents keep their
+    model and HTTP client, and their conversation is reset when returned.
+    """
+    
+    _idle_agents: Dict[tuple, list] = defaultdict(list)
+    _checked_out: Dict[int, tuple] = {}
+    _pool_lock = threading.Lock()
     
     @staticmethod
     def create_ollama_model(
@@ -172,8 +828,9 @@ class AgentFactory:
         host: str = OLLAMA_HOST,
         temperature: float = OLLAMA_TEMPERATURE,
         max_tokens: Optional[int] = None
-    ) -> OllamaModel:
+    ) -> 'OllamaModel':
         """Create an Ollama model instance."""
+        from strands.models.ollama import OllamaModel
         logger.debug(f"Creating Ollama model: {model_id}")
         kwargs = {
             'model_id': model_id,
@@ -182,24 +839,25 @@ class AgentFactory:
         }
         if max_tokens is not None:
             kwargs['max_tokens'] = max_tokens
+        # Ollama's default context is much smaller than what the chunk budget assumes
+        kwargs['options'] = {'num_ctx': OLLAMA_CONTEXT_TOKENS}
         return OllamaModel(**kwargs)
     
     @staticmethod
     def create_scrum_agent(
-        model: Optional[OllamaModel] = None,
+        model: Optional['OllamaModel'] = None,
         tools: list = None,
         hooks: list = None
-    ) -> Agent:
+    ) -> 'Agent':
         """Create a scrum master agent."""
+        from strands import Agent
         logger.debug("Creating scrum agent")
         if model is None:
             model = AgentFactory.create_ollama_model()
         
         kwargs = {
             'model': model,
-            'system_prompt': """
-                You are scrum master managing project team for which you need to report various information from Jira backlog to project manager. Your project is agile project with 2 weeks sprints and follows the standard flow of design, architecture,build and so on.
-            """
+            'system_prompt': SCRUM_SYSTEM_PROMPT
         }
         if tools:
             kwargs['tools'] = tools
@@ -210,26 +868,618 @@ class AgentFactory:
     
     @staticmethod
     def create_pm_agent(
-        model: Optional[OllamaModel] = None,
-        tools: list = None
-    ) -> Agent:
+        model: Optional['OllamaModel'] = None,
+        tools: list = None,
+        hooks: list = None
+    ) -> 'Agent':
         """Create a project manager agent."""
+        from strands import Agent
         logger.debug("Creating PM agent")
         if model is None:
             model = AgentFactory.create_ollama_model()
         
         kwargs = {
             'model': model,
-            'system_prompt': """
-                You are project manager who has to report executive summaries about project status to management board. Your project is agile project with 2 weeks sprints and follows the standard flow of design, architecture,build and so on. You get information from scrum master which you have to transform to high level summary for final report.
-            """
+            'system_prompt': PM_SYSTEM_PROMPT
         }
         if tools:
             kwargs['tools'] = tools
+        if hooks:
+            kwargs['hooks'] = hooks
             
         return Agent(**kwargs)
 
 
+    @classmethod
+    def checkout_agent(
+        cls,
+        role: str = 'scrum',
+        model_id: str = OLLAMA_MODEL,
+        max_tokens: Optional[int] = None,
+        max_tool_counts: Optional[Dict[str, int]] = None
+    ) -> 'Agent':
+        """
+        Take an agent out of the pool, creating one if none is idle.
+        
+        Args:
+            role: Agent role, either 'scrum' or 'pm'
+            model_id: Ollama model ID
+            max_tokens: Optional output token limit of the model
+            max_tool_counts: Optional per-tool call limits enforced by a
+                LimitToolCounts hook owned by the agent
+            
+        Returns:
+            Agent with an empty conversation; hand it back with return_agent
+        """
+        key = (
+            role,
+            model_id,
+            OLLAMA_HOST,
+            OLLAMA_TEMPERATURE,
+            max_tokens,
+            tuple(sorted((max_tool_counts or {}).items()))
+        )
+        with cls._pool_lock:
+            idle = cls._idle_agents[key]
+            agent = idle.pop() if idle else None
+        
+        if agent is None:
+            logger.debug(f"Agent pool miss for {role} agent, creating a new one")
+            from tools.strands_limit_hook import LimitToolCounts
+            model = cls.create_ollama_model(model_id=model_id, max_tokens=max_tokens)
+            hooks = [LimitToolCounts(max_tool_counts=max_tool_counts)] if max_tool_counts else None
+            if role == 'scrum':
+                agent = cls.create_scrum_agent(model=model, hooks=hooks)
+            elif role == 'pm':
+                agent = cls.create_pm_agent(model=model, hooks=hooks)
+            else:
+                raise ValueError(f"Unknown agent role: {role}")
+        
+        with cls._pool_lock:
+            cls._checked_out[id(agent)] = key
+        return agent
+    
+    @classmethod
+    def return_agent(cls, agent: 'Agent') -> None:
+        """
+        Reset an agent's conversation and put it back into the pool.
+        
+        Args:
+            agent: Agent previously obtained from checkout_agent
+        """
+        with cls._pool_lock:
+            key = cls._checked_out.pop(id(agent), None)
+        if key is None:
+            logger.warning("Ignoring agent that was not checked out from the pool")
+            return
+        agent.messages.clear()
+        with cls._pool_lock:
+            cls._idle_agents[key].append(agent)
+    
+    @classmethod
+    @contextmanager
+    def pooled_agent(
+        cls,
+        role: str = 'scrum',
+        model_id: str = OLLAMA_MODEL,
+        max_tokens: Optional[int] = None,
+        max_tool_counts: Optional[Dict[str, int]] = None
+    ) -> Iterator['Agent']:
+        """
+        Check out a pooled agent for the duration of a with-block.
+        
+        Args:
+            role: Agent role, either 'scrum' or 'pm'
+            model_id: Ollama model ID
+            max_tokens: Optional output token limit of the model
+            max_tool_counts: Optional per-tool call limits
+            
+        Yields:
+            Agent with an empty conversation
+        """
+        agent = cls.checkout_agent(role, model_id, max_tokens, max_tool_counts)
+        try:
+            yield agent
+        finally:
+            cls.return_agent(agent)
+
+
+class SQLiteCacheBackend:
+    """Stores LLM responses in a local SQLite file."""
+    
+    def __init__(self, path: str = LLM_CACHE_PATH):
+        """
+        Open (and create if needed) the cache database.
+        
+        Args:
+            path: Location of the SQLite file
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_accessed_idx ON llm_cache (accessed_at)")
+        logger.info(f"LLM response cache opened at {path}")
+    
+    def get(self, key: str, ttl: float) -> Optional[str]:
+        """Return a cached response younger than ttl seconds and mark it as used."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response FROM llm_cache WHERE key=? AND created_at>=?",
+                (key, now - ttl)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE llm_cache SET accessed_at=? WHERE key=?", (now, key))
+        return row[0]
+    
+    def set(self, key: str, response: str) -> None:
+        """Store a response."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, response, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, response, now, now)
+            )
+    
+    def evict(self, ttl: float, max_entries: int) -> None:
+        """Drop expired entries and the least recently used ones above max_entries."""
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache WHERE created_at<?", (time.time() - ttl,))
+            self._conn.execute(
+                "DELETE FROM llm_cache WHERE key IN ("
+                "SELECT key FROM llm_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (max_entries,)
+            )
+
+
+class PostgresCacheBackend:
+    """Stores LLM responses in the devops.crew_pm_llm_cache table."""
+    
+    def __init__(self, db_manager: DatabaseManager):
+        """
+        Initialize backend with a database manager.
+        
+        Args:
+            db_manager: Database manager used for cache queries
+        """
+        self.db_manager = db_manager
+    
+    def get(self, key: str, ttl: float) -> Optional[str]:
+        """Return a cached response younger than ttl seconds and mark it as used."""
+        query = """
+            UPDATE devops.crew_pm_llm_cache 
+            SET accessed_at=now() 
+            WHERE key=%s AND created_at >= now() - make_interval(secs => %s) 
+            RETURNING response
+        """
+        rows = self.db_manager.execute_query(query, (key, ttl))
+        return rows[0][0] if rows else None
+    
+    def set(self, key: str, response: str) -> None:
+        """Store a response."""
+        query = """
+            INSERT INTO devops.crew_pm_llm_cache (key, response, created_at, accessed_at) 
+            VALUES (%s, %s, now(), now()) 
+            ON CONFLICT (key) 
+            DO UPDATE SET response=EXCLUDED.response, created_at=now(), accessed_at=now()
+        """
+        self.db_manager.execute_query(query, (key, response), fetch=False)
+    
+    def evict(self, ttl: float, max_entries: int) -> None:
+        """Drop expired entries and the least recently used ones above max_entries."""
+        self.db_manager.execute_query(
+            "DELETE FROM devops.crew_pm_llm_cache WHERE created_at < now() - make_interval(secs => %s)",
+            (ttl,),
+            fetch=False
+        )
+        self.db_manager.execute_query(
+            """
+            DELETE FROM devops.crew_pm_llm_cache WHERE key IN (
+                SELECT key FROM devops.crew_pm_llm_cache ORDER BY accessed_at DESC OFFSET %s
+            )
+            """,
+            (max_entries,),
+            fetch=False
+        )
+
+
+class LLMResponseCache:
+    """
+    Caches LLM responses keyed by a fingerprint of the request.
+    
+    The key covers model ID, system prompt, prompt text, temperature, output
+    token limit and output schema, so any change to the request is a miss.
+    Entries expire after ttl seconds and the least recently used entries are
+    evicted beyond max_entries.
+    """
+    
+    def __init__(self, backend, ttl: float = LLM_CACHE_TTL, max_entries: int = LLM_CACHE_MAX_ENTRIES):
+        """
+        Initialize cache with a storage backend.
+        
+        Args:
+            backend: SQLiteCacheBackend or PostgresCacheBackend
+            ttl: Maximum age of a cached response in seconds
+            max_entries: Number of entries kept by LRU eviction
+        """
+        self.backend = backend
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def make_key(
+        model_id: str,
+        system_prompt: str,
+        prompt: str,
+        temperature: float,
+        max_tokens: Optional[int] = None,
+        output_schema: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """Build the cache key of an LLM request."""
+        request = json.dumps({
+            'model_id': model_id,
+            'system_prompt': system_prompt,
+            'prompt': prompt,
+            'temperature': temperature,
+            'max_tokens': max_tokens,
+            'output_schema': output_schema,
+        }, sort_keys=True)
+        return hashlib.sha256(request.encode('utf-8')).hexdigest()
+    
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for key, counting hits and misses."""
+        try:
+            response = self.backend.get(key, self.ttl)
+        except Exception as e:
+            logger.warning(f"LLM cache lookup failed: {e}")
+            response = None
+        with self._lock:
+            if response is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return response
+    
+    def set(self, key: str, response: str) -> None:
+        """Store a response, evicting old entries every few hundred writes."""
+        try:
+            self.backend.set(key, response)
+            with self._lock:
+                self._writes += 1
+                evict = self._writes % LLM_CACHE_EVICT_EVERY == 1
+            if evict:
+                self.backend.evict(self.ttl, self.max_entries)
+        except Exception as e:
+            logger.warning(f"LLM cache store failed: {e}")
+    
+    def stats(self) -> Dict[str, int]:
+        """Return hit and miss counters."""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses}
+
+
+_llm_cache = None
+_llm_cache_lock = threading.Lock()
+_llm_slots = threading.BoundedSemaphore(LLM_MAX_CONCURRENCY) if LLM_MAX_CONCURRENCY > 0 else None
+
+
+def set_llm_concurrency(limit: Optional[int]) -> None:
+    """
+    Cap the in-flight LLM requests of the process across all worker pools.
+    
+    Args:
+        limit: Maximum concurrent LLM calls; None or 0 removes the cap
+    """
+    global _llm_slots
+    _llm_slots = threading.BoundedSemaphore(limit) if limit else None
+    logger.info(f"LLM concurrency cap: {limit or 'none'}")
+
+
+def get_llm_cache() -> Optional[LLMResponseCache]:
+    """
+    Get the process-wide LLM response cache.
+    
+    Returns:
+        LLMResponseCache for the configured backend, or None if disabled
+    """
+    global _llm_cache
+    with _llm_cache_lock:
+        if _llm_cache is None and LLM_CACHE_BACKEND:
+            if LLM_CACHE_BACKEND == "postgres":
+                backend = PostgresCacheBackend(get_db_manager())
+            elif LLM_CACHE_BACKEND == "sqlite":
+                backend = SQLiteCacheBackend(LLM_CACHE_PATH)
+            else:
+                raise ValueError(f"Unknown LLM cache backend: {LLM_CACHE_BACKEND}")
+            _llm_cache = LLMResponseCache(backend)
+        return _llm_cache
+
+
+def call_agent(
+    prompt: str,
+    role: str = 'scrum',
+    structured_output_model: Optional[Type['BaseModel']] = None,
+    max_tokens: Optional[int] = None,
+    max_tool_counts: Optional[Dict[str, int]] = None,
+    use_cache: bool = True
+) -> Union[str, 'BaseModel']:
+    """
+    Call a pooled agent, serving repeated requests from the LLM response cache.
+    
+    Args:
+        prompt: Prompt sent to the agent
+        role: Agent role, either 'scrum' or 'pm'
+        structured_output_model: Optional pydantic model for structured output
+        max_tokens: Optional output token limit of the model
+        max_tool_counts: Optional per-tool call limits
+        use_cache: If False, always call the model
+        
+    Returns:
+        Structured output instance if a model was given, response text otherwise
+    """
+    cache = get_llm_cache() if use_cache else None
+    key = None
+    if cache is not None:
+        output_schema = structured_output_model.model_json_schema() if structured_output_model else None
+        key = LLMResponseCache.make_key(
+            OLLAMA_MODEL,
+            SYSTEM_PROMPTS[role],
+            prompt,
+            OLLAMA_TEMPERATURE,
+            max_tokens,
+            output_schema
+        )
+        cached = cache.get(key)
+        if cached is not None:
+            logger.debug(f"LLM cache hit for {role} agent")
+            if structured_output_model:
+                return structured_output_model.model_validate_json(cached)
+            return cached
+    
+    with _llm_slots or nullcontext(), AgentFactory.pooled_agent(role, max_tokens=max_tokens, max_tool_counts=max_tool_counts) as agent:
+        if structured_output_model:
+            result = agent(prompt, structured_output_model=structured_output_model).structured_output
+            serialized = result.model_dump_json()
+        else:
+            result = agent(prompt).message['content'][0]['text']
+            serialized = result
+    
+    if cache is not None:
+        cache.set(key, serialized)
+    return result
+
+
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+_tokenizer = None
+_tokenizer_lock = threading.Lock()
+
+
+def _get_tokenizer():
+    """Load the tokenizer configured in OLLAMA_TOKENIZER, or return None to use the estimator."""
+    global _tokenizer
+    if not OLLAMA_TOKENIZER:
+        return None
+    with _tokenizer_lock:
+        if _tokenizer is None:
+            try:
+                from tokenizers import Tokenizer
+                _tokenizer = Tokenizer.from_file(OLLAMA_TOKENIZER)
+                logger.info(f"Counting tokens with tokenizer {OLLAMA_TOKENIZER}")
+            except Exception as e:
+                logger.warning(f"Could not load tokenizer {OLLAMA_TOKENIZER}, estimating token counts: {e}")
+                _tokenizer = False
+    return _tokenizer or None
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens in text without a tokenizer.
+    
+    Words count one token per four characters and every punctuation character
+    counts as one token. This stays close to BPE tokenizers for prose and errs
+    on the high side for dense text such as JSON.
+    
+    Args:
+        text: Text to measure
+        
+    Returns:
+        Estimated token count
+    """
+    return sum(-(-len(match) // 4) for match in _TOKEN_PATTERN.findall(text))
+
+
+def count_tokens(text: str) -> int:
+    """
+    Count tokens in text with the model's tokenizer if configured, else estimate them.
+    
+    Args:
+        text: Text to measure
+        
+    Returns:
+        Token count
+    """
+    if not text:
+        return 0
+    tokenizer = _get_tokenizer()
+    if tokenizer is not None:
+        return len(tokenizer.encode(text, add_special_tokens=False).ids)
+    return estimate_tokens(text)
+
+
+def chunk_token_budget(fraction: float = CHUNK_CONTEXT_FRACTION, reserve: int = CHUNK_PROMPT_RESERVE) -> int:
+    """
+    Token budget for one chunk of content in a prompt.
+    
+    The context window minus the output tokens (OLLAMA_MAX_TOKENS) and the
+    prompt reserve is what a prompt may use; a chunk fills fraction of it.
+    
+    Args:
+        fraction: Share of the available prompt tokens used by one chunk
+        reserve: Tokens reserved for system prompt and instructions
+        
+    Returns:
+        Token budget per chunk
+    """
+    available = OLLAMA_CONTEXT_TOKENS - OLLAMA_MAX_TOKENS - reserve
+    return max(1, int(available * fraction))
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """
+    Truncate text to at most max_tokens tokens.
+    
+    Args:
+        text: Text to truncate
+        max_tokens: Maximum token count
+        
+    Returns:
+        Text itself if it fits, else its longest fitting prefix
+    """
+    if count_tokens(text) <= max_tokens:
+        return text
+    # Binary search on the prefix length; token counts grow with the prefix
+    low, high = 0, len(text)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if count_tokens(text[:middle]) <= max_tokens:
+            low = middle
+        else:
+            high = middle - 1
+    return text[:low]
+
+
+def split_text(text: str, limit: int, measure: Callable[[str], int] = count_tokens) -> List[str]:
+    """
+    Split text into pieces of at most limit, preferring line boundaries.
+    
+    Args:
+        text: Text to split
+        limit: Maximum size of a piece as returned by measure
+        measure: Size function, token count by default
+        
+    Returns:
+        List of pieces that concatenate to text
+    """
+    size = measure(text)
+    if size <= limit:
+        return [text]
+    lines = text.splitlines(keepends=True)
+    if len(lines) > 1:
+        pieces = [piece for line in lines for piece in split_text(line, limit, measure)]
+        return pack_chunks(pieces, limit, measure=measure)
+    # A single oversized line is cut proportionally to its size
+    step = max(1, len(text) * limit // size)
+    return [text[i:i + step] for i in range(0, len(text), step)]
+
+
+def pack_chunks(
+    items: Iterable[str],
+    limit: int,
+    separator: str = "",
+    min_items: int = 1,
+    measure: Callable[[str], int] = len
+) -> List[str]:
+    """
+    Greedily pack items into chunks of at most limit.
+    
+    An item larger than limit forms its own chunk.
+    
+    Args:
+        items: Strings to pack, in order
+        limit: Maximum chunk size as returned by measure
+        separator: String placed between items of a chunk
+        min_items: Items a chunk takes regardless of limit
+        measure: Size function, character count by default
+        
+    Returns:
+        List of chunks
+    """
+    separator_size = measure(separator)
+    chunks = []
+    current = []
+    length = 0
+    for item in items:
+        item_size = measure(item)
+        added = item_size + (separator_size if current else 0)
+        if current and length + added > limit and len(current) >= min_items:
+            chunks.append(separator.join(current))
+            current, length = [], 0
+            added = item_size
+        current.append(item)
+        length += added
+    if current:
+        chunks.append(separator.join(current))
+    return chunks
+
+
+def tree_summarize(
+    items: List[str],
+    summarize: Callable[[str], str],
+    limit: Optional[int] = None,
+    merge: Optional[Callable[[str], str]] = None,
+    separator: str = "",
+    merge_final: bool = True,
+    max_workers: int = SUMMARY_MAX_WORKERS,
+    measure: Callable[[str], int] = count_tokens
+) -> str:
+    """
+    Summarize content with a parallel map-reduce tree.
+    
+    Items are packed into chunks of at most limit tokens and all chunks
+    are summarized in parallel. The resulting summaries are packed and merged
+    the same way, level by level, until one summary remains. Latency grows
+    with the number of levels, O(log N), instead of the number of chunks.
+    
+    Args:
+        items: Content strings, in order
+        summarize: Summarizes one chunk of original content
+        limit: Maximum chunk size; defaults to chunk_token_budget()
+        merge: Summarizes one chunk of summaries; defaults to summarize
+        separator: String placed between items of a chunk
+        merge_final: If False, summaries that fit into a single chunk are
+            returned joined instead of being merged by one more call
+        max_workers: Maximum number of concurrent summarize calls
+        measure: Size function, token count by default
+        
+    Returns:
+        Summary string, empty if there is no content
+    """
+    merge = merge or summarize
+    limit = limit or chunk_token_budget()
+    # Items that exceed a chunk on their own are split so no prompt overflows
+    parts = [piece for item in items for piece in split_text(item, limit, measure)]
+    if not parts:
+        return ""
+    
+    level = 0
+    with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="tree-summary") as executor:
+        while True:
+            # Merge levels take at least two summaries per chunk so the tree always shrinks
+            chunks = pack_chunks(parts, limit, separator, min_items=1 if level == 0 else 2, measure=measure)
+            if level > 0 and len(chunks) == 1:
+                return merge(chunks[0]) if merge_final else chunks[0]
+            logger.debug(f"Tree summary level {level}: {len(chunks)} chunks")
+            parts = list(executor.map(summarize if level == 0 else merge, chunks))
+            if len(parts) == 1:
+                return parts[0]
+            level += 1
+
+
 def setup_logging(name: str, level: int = logging.DEBUG) -> logging.Logger:
     """Setup logging for a module."""
     log = logging.getLogger(name)
@@ -1,16 +1,149 @@
-import requests
+import hashlib
+import logging
+import time
 import json
+from connectors.transport import create_async_client, create_session
 
 
-class ConfluenceApi:
-    def __init__(self, hostname, auth_token):
+PAGE_CACHE_TTL = 3600  # seconds page version metadata is trusted without a GET
+DEFAULT_ASYNC_CONCURRENCY = 16
+# Content property holding the digest of the body last published and the page version it created
+DIGEST_PROPERTY = "scrum-agent-published-digest"
+
+logger = logging.getLogger(__name__)
+
+
+class _PageState:
+    """Published-content digests and page version metadata shared by the sync and async clients."""
+
+    def __init__(self, hostname, auth_token, page_cache_ttl=PAGE_CACHE_TTL):
         self.hostname = hostname
         self.auth_token = auth_token
-        self.session = requests.Session()
-        self.session.headers = {
+        self.headers = {
             "Content-Type": "application/json",
             "Authorization": f"Bearer {auth_token}",
         }
+        # page id -> digest of the body last published or seen on the page
+        self._published_digests = {}
+        # page id -> version number of its digest property
+        self._digest_property_versions = {}
+        # page id -> (fetched at, id, title, space key, version number)
+        self.page_cache_ttl = page_cache_ttl
+        self._page_cache = {}
+
+    @staticmethod
+    def content_digest(content):
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    def _is_published(self, page_id, digest):
+        return self._published_digests.get(str(page_id)) == digest
+
+    def _mark_published(self, page_id, digest):
+        self._published_digests[str(page_id)] = digest
+
+    def _get_cached_page(self, page_id):
+        entry = self._page_cache.get(str(page_id))
+        if entry is None or time.monotonic() - entry[0] > self.page_cache_ttl:
+            return None
+        return entry[1:]
+
+    def _cache_page(self, page_id, content_id, title, space_key, version):
+        self._page_cache[str(page_id)] = (time.monotonic(), content_id, title, space_key, version)
+
+    def _read_page(self, page_id, response):
+        """
+        Parse a page fetched with version, space, body and digest property, caching its metadata.
+
+        Confluence normalizes the storage value, so a published body rarely
+        equals the rendered one. The digest property survives across processes
+        and counts as published while the page is still at the version our
+        update created, i.e. nobody edited it since.
+        """
+        if response.status_code != 200:
+            raise Exception(f"Error getting old page: {response.status_code}")
+        page = response.json()
+        meta = (page["id"], page["title"], page["space"]["key"], page["version"]["number"])
+        self._cache_page(page_id, *meta)
+        prop = page.get("metadata", {}).get("properties", {}).get(DIGEST_PROPERTY)
+        if prop:
+            self._digest_property_versions[str(page_id)] = prop["version"]["number"]
+            if prop["value"].get("version") == meta[3]:
+                self._mark_published(page_id, prop["value"]["digest"])
+        return meta, page["body"]["storage"]["value"]
+
+    def _page_update(self, meta, new_content):
+        content_id, title, space_key, version = meta
+        return json.dumps({
+            "id": content_id,
+            "type": "page",
+            "title": title,
+            "space": {"key": space_key},
+            "body": {
+                "storage": {
+                    "value": new_content,
+                    "representation": "storage",
+                }
+            },
+            "version": {"number": version + 1},
+        })
+
+    def _read_update(self, page_id, meta, digest, response):
+        """Record a successful update and return the new version, or drop the cached metadata and raise."""
+        if response.status_code != 200:
+            self._page_cache.pop(str(page_id), None)
+            raise Exception(f"Error updating page {page_id}: {response.status_code}")
+        page = response.json()
+        self._cache_page(page_id, page["id"], page["title"], meta[2], page["version"]["number"])
+        self._mark_published(page_id, digest)
+        return page["version"]["number"]
+
+    def _digest_property_request(self, page_id, digest, version):
+        """Method, URL and body storing the digest of the body published as the given page version."""
+        url = f"{self.hostname}/rest/api/content/{page_id}/property"
+        prop = {"key": DIGEST_PROPERTY, "value": {"digest": digest, "version": version}}
+        prop_version = self._digest_property_versions.get(str(page_id))
+        if prop_version is None:
+            return "POST", url, json.dumps(prop)
+        prop["version"] = {"number": prop_version + 1}
+        return "PUT", f"{url}/{DIGEST_PROPERTY}", json.dumps(prop)
+
+    def _read_digest_property(self, page_id, response):
+        """
+        Record the stored digest property.
+
+        The page itself is already published, so a failure only costs an
+        update of unchanged content in a later process and is logged.
+        """
+        if response.status_code in (200, 201):
+            self._digest_property_versions[str(page_id)] = response.json()["version"]["number"]
+        else:
+            # Unknown property version, the next fetch of the page reads it again
+            self._digest_property_versions.pop(str(page_id), None)
+            logger.warning(f"Error storing published digest of page {page_id}: {response.status_code}")
+
+    @staticmethod
+    def _read_content(page_id, response):
+        if response.status_code == 200:
+            page_data = response.json()
+            return {
+                "id": page_data["id"],
+                "title": page_data["title"],
+                "content": page_data["body"]["storage"]["value"]
+            }
+        else:
+            raise Exception(f"Error fetching page {page_id}: {response.status_code}")
+
+
+class ConfluenceApi(_PageState):
+    def __init__(self, hostname, auth_token, page_cache_ttl=PAGE_CACHE_TTL):
+        super().__init__(hostname, auth_token, page_cache_ttl)
+        self.session = create_session(hostname)
+        self.session.headers = self.headers
+
+    def set_auth_token(self, auth_token):
+        """Use a new token for subsequent requests, e.g. after a rotation."""
+        self.auth_token = auth_token
+        self.headers["Authorization"] = f"Bearer {auth_token}"
 
     def get_spaces(self):
         response = self.session.get(f"{self.hostname}/rest/api/space")
@@ -22,46 +155,157 @@ class ConfluenceApi:
     def get_page_content(self, page_id):
         """
         Get the content of a Confluence page by its ID.
-        
+
         Args:
             page_id: The Confluence page ID
-            
+
         Returns:
             Dictionary with page content including title and body
         """
         url = f"{self.hostname}/rest/api/content/{page_id}?expand=body.storage"
-        response = self.session.get(url)
-        if response.status_code == 200:
-            page_data = response.json()
-            return {
-                "id": page_data["id"],
-                "title": page_data["title"],
-                "content": page_data["body"]["storage"]["value"]
-            }
-        else:
-            raise Exception(f"Error fetching page {page_id}: {response.status_code}")
+        return self._read_content(page_id, self.session.get(url))
+
+    def _fetch_page(self, page_id):
+        """
+        Fetch the version metadata and current body of a page and cache the metadata.
+
+        Args:
+            page_id: The Confluence page ID
+
+        Returns:
+            Tuple of (id, title, space key, version number) and the storage value
+        """
+        url = f"{self.hostname}/rest/api/content/{page_id}"
+        expand = f"version,space,body.storage,metadata.properties.{DIGEST_PROPERTY}"
+        response = self.session.get(url, params={"expand": expand})
+        return self._read_page(page_id, response)
+
+    def _put_page(self, page_id, meta, new_content):
+        url = f"{self.hostname}/rest/api/content/{page_id}"
+        return self.session.put(url=url, data=self._page_update(meta, new_content))
 
     def update_page(self, page_id, new_content):
+        """
+        Publish new content to a Confluence page unless it is unchanged.
+
+        The content is compared with the digest of the body last published,
+        kept in memory and in a content property of the page, and whenever the
+        page is fetched with its current storage value, so an unchanged page
+        causes no PUT and no new version, also in a new process. While the
+        cached version metadata is fresh the update is a single PUT; a version
+        conflict refreshes the metadata and retries once. A published update
+        stores its digest in the page property.
+
+        Args:
+            page_id: The Confluence page ID
+            new_content: Page body in storage representation
+
+        Returns:
+            True if a new version was published, False if the page was unchanged
+        """
+        digest = self.content_digest(new_content)
+        if self._is_published(page_id, digest):
+            return False
+
+        meta = self._get_cached_page(page_id)
+        response = self._put_page(page_id, meta, new_content) if meta is not None else None
+        if response is None or response.status_code == 409:
+            # Unknown or stale version, read the actual page
+            meta, current_content = self._fetch_page(page_id)
+            if self._is_published(page_id, digest) or current_content == new_content:
+                self._mark_published(page_id, digest)
+                return False
+            response = self._put_page(page_id, meta, new_content)
+
+        version = self._read_update(page_id, meta, digest, response)
+        method, url, body = self._digest_property_request(page_id, digest, version)
+        self._read_digest_property(page_id, self.session.request(method, url, data=body))
+        return True
+
+
+class AsyncConfluenceApi(_PageState):
+    """
+    asyncio counterpart of ConfluenceApi on httpx.
+
+    Shares the retry, timeout and rate-limit handling and the unchanged-page
+    and version-cache behaviour of the sync client. Use as an async context
+    manager, or call aclose when done.
+    """
+
+    def __init__(
+        self,
+        hostname,
+        auth_token,
+        page_cache_ttl=PAGE_CACHE_TTL,
+        max_concurrent_requests=DEFAULT_ASYNC_CONCURRENCY
+    ):
+        super().__init__(hostname, auth_token, page_cache_ttl)
+        self.client = create_async_client(
+            hostname,
+            headers=self.headers,
+            pool_maxsize=max_concurrent_requests,
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self):
+        await self.client.aclose()
+
+    async def get_page_content(self, page_id):
+        """
+        Get the content of a Confluence page by its ID.
+
+        Args:
+            page_id: The Confluence page ID
+
+        Returns:
+            Dictionary with page content including title and body
+        """
+        url = f"{self.hostname}/rest/api/content/{page_id}?expand=body.storage"
+        return self._read_content(page_id, await self.client.get(url))
+
+    async def _fetch_page(self, page_id):
         url = f"{self.hostname}/rest/api/content/{page_id}"
-        # read actual page
-        response = self.session.get(url)
-        if response.status_code == 200:
-            old_content = response.json()
-            # construct new content
-            data = {
-                "id": old_content["id"],
-                "type": "page",
-                "title": old_content["title"],
-                "space": old_content["space"],
-                "body": {
-                    "storage": {
-                        "value": new_content,
-                        "representation": "storage",
-                    }
-                },
-                "version": {"number": old_content["version"]["number"] + 1},
-            }
-            r = self.session.put(url=url, data=json.dumps(data))
-            print(r.json())
-        else:
-            raise Exception(f"Error getting old page: {response.status_code}")
+        expand = f"version,space,body.storage,metadata.properties.{DIGEST_PROPERTY}"
+        response = await self.client.get(url, params={"expand": expand})
+        return self._read_page(page_id, response)
+
+    async def _put_page(self, page_id, meta, new_content):
+        url = f"{self.hostname}/rest/api/content/{page_id}"
+        return await self.client.put(url, content=self._page_update(meta, new_content))
+
+    async def update_page(self, page_id, new_content):
+        """
+        Publish new content to a Confluence page unless it is unchanged.
+
+        See ConfluenceApi.update_page.
+
+        Args:
+            page_id: The Confluence page ID
+            new_content: Page body in storage representation
+
+        Returns:
+            True if a new version was published, False if the page was unchanged
+        """
+        digest = self.content_digest(new_content)
+        if self._is_published(page_id, digest):
+            return False
+
+        meta = self._get_cached_page(page_id)
+        response = await self._put_page(page_id, meta, new_content) if meta is not None else None
+        if response is None or response.status_code == 409:
+            # Unknown or stale version, read the actual page
+            meta, current_content = await self._fetch_page(page_id)
+            if self._is_published(page_id, digest) or current_content == new_content:
+                self._mark_published(page_id, digest)
+                return False
+            response = await self._put_page(page_id, meta, new_content)
+
+        version = self._read_update(page_id, meta, digest, response)
+        method, url, body = self._digest_property_request(page_id, digest, version)
+        self._read_digest_property(page_id, await self.client.request(method, url, content=body))
+        return True
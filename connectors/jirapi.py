@@ -1,17 +1,37 @@
+import asyncio
 import requests
 import json
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from connectors.transport import create_async_client, create_session, httpx
+
+ISSUE_FIELDS = "key,summary,assignee,created,updated,resolved,status,description,priority,team,labels,components"
+DEFAULT_PAGE_SIZE = 100
+DEFAULT_POOL_SIZE = 10
+DEFAULT_ASYNC_CONCURRENCY = 32
 
 
 class JiraApi:
-    def __init__(self, hostname, auth_token):
+    def __init__(self, hostname, auth_token, max_concurrent_requests=1):
         self.hostname = hostname
         self.auth_token = auth_token
-        self.session = requests.Session()
+        self.max_concurrent_requests = max_concurrent_requests
+        # Keep enough pooled connections for parallel page prefetch
+        self.session = create_session(
+            hostname,
+            pool_maxsize=max(DEFAULT_POOL_SIZE, max_concurrent_requests)
+        )
         self.session.headers = {
             "Content-Type": "application/json",
             "Authorization": f"Bearer {auth_token}",
         }
 
+    def set_auth_token(self, auth_token):
+        """Use a new token for subsequent requests, e.g. after a rotation."""
+        self.auth_token = auth_token
+        self.session.headers["Authorization"] = f"Bearer {auth_token}"
+
     def search_by_filter(self, filter_id):
         url = f"{self.hostname}/rest/api/2/filter/{filter_id}"
         try:
@@ -31,17 +51,111 @@ class JiraApi:
     def search_issues(
         self,
         jql,
-        fields="key,summary,assignee,created,updated,resolved,status,description,priority,team,labels,components",
-        max_results=5000,
+        fields=ISSUE_FIELDS,
+        max_results=None,
+        page_size=DEFAULT_PAGE_SIZE,
+        validate_query=None,
     ):
+        """
+        Search Jira issues and return them as a list.
+
+        Walks all result pages, so large JQLs are no longer cut off by the
+        server's page cap. Prefer iter_issues for big result sets.
+
+        Args:
+            jql: JQL query string
+            fields: Comma-separated list of fields to retrieve
+            max_results: Optional upper bound on the number of returned issues
+            page_size: Number of issues requested per page
+            validate_query: Optional validateQuery mode, e.g. "warn" to ignore
+                unknown or inaccessible issue keys instead of failing
+
+        Returns:
+            List of issue dictionaries
+        """
+        issues = []
+        for issue in self.iter_issues(jql, fields=fields, page_size=page_size, validate_query=validate_query):
+            if max_results is not None and len(issues) >= max_results:
+                break
+            issues.append(issue)
+        return issues
+
+    def iter_issues(self, jql, fields=ISSUE_FIELDS, page_size=DEFAULT_PAGE_SIZE, validate_query=None):
+        """
+        Iterate over Jira issues matching a JQL query page by page.
+
+        Issues are yielded as soon as their page arrives, so callers can start
+        working before the last page has been fetched. Once the first response
+        reveals the total, up to max_concurrent_requests pages are prefetched
+        in parallel; pages are still yielded in search order.
+
+        The parallel prefetch plans its page offsets from the total of the
+        first response and does not re-read it, so issues added to the result
+        set meanwhile may be missed and removed ones may shift issues across
+        page boundaries. The sequential path (max_concurrent_requests <= 1)
+        follows the total of every page.
+
+        Args:
+            jql: JQL query string
+            fields: Comma-separated list of fields to retrieve
+            page_size: Number of issues requested per page
+            validate_query: Optional validateQuery mode, see search_issues
+
+        Yields:
+            Issue dictionaries in search order
+        """
+        first_page = self._search_page(jql, fields, 0, page_size, validate_query)
+        issues = first_page.get("issues", [])
+        yield from issues
+        total = first_page.get("total", len(issues))
+        if not issues or len(issues) >= total:
+            return
+
+        if self.max_concurrent_requests <= 1:
+            start_at = len(issues)
+            while start_at < total:
+                page = self._search_page(jql, fields, start_at, page_size, validate_query)
+                issues = page.get("issues", [])
+                if not issues:
+                    break
+                yield from issues
+                start_at += len(issues)
+                total = page.get("total", start_at)
+            return
+
+        # The server may cap maxResults below the requested page size
+        page_size = len(issues)
+        offsets = iter(range(page_size, total, page_size))
+        executor = ThreadPoolExecutor(max_workers=self.max_concurrent_requests)
+        pending = deque()
+        try:
+            for start_at in islice(offsets, self.max_concurrent_requests):
+                pending.append(executor.submit(self._search_page, jql, fields, start_at, page_size, validate_query))
+            while pending:
+                page = pending.popleft().result()
+                start_at = next(offsets, None)
+                if start_at is not None:
+                    pending.append(executor.submit(self._search_page, jql, fields, start_at, page_size, validate_query))
+                yield from page.get("issues", [])
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _search_page(self, jql, fields, start_at, page_size, validate_query=None):
         issue_search_endpoint = f"{self.hostname}/rest/api/2/search"
-        issue_params = {"jql": jql, "fields": fields, "maxResults": max_results}
+        issue_params = {
+            "jql": jql,
+            "fields": fields,
+            "startAt": start_at,
+            "maxResults": page_size,
+        }
+        if validate_query is not None:
+            issue_params["validateQuery"] = validate_query
         try:
             issue_response = self.session.get(
                 issue_search_endpoint, params=issue_params
             )
             issue_response.raise_for_status()
-            return issue_response.json().get("issues", [])
+            return issue_response.json()
         except requests.exceptions.RequestException as e:
             raise Exception(f"An error occurred during issue search: {e}")
         except json.JSONDecodeError:
@@ -49,7 +163,7 @@ class JiraApi:
                 f"Failed to decode JSON. Response text was: {issue_response.text}"
             )
 
-    def get_issue(self, issue_key, fields="key,summary,assignee,created,updated,resolved,status,description,priority,team,labels,components"):
+    def get_issue(self, issue_key, fields=ISSUE_FIELDS):
         """
         Get a single Jira issue by its key.
         
@@ -215,4 +329,142 @@ class JiraApi:
                     error_message += f"\nRaw response text: {response.text}"
             raise Exception(error_message)
         except Exception as e: # Catch other potential errors like missing transition
-            raise Exception(f"An unexpected error occurred during issue resolution for {issue_key}: {e}")
\ No newline at end of file
+            raise Exception(f"An unexpected error occurred during issue resolution for {issue_key}: {e}")
+
+
+class AsyncJiraApi:
+    """
+    asyncio counterpart of JiraApi on httpx.
+
+    Requests share the retry, timeout and rate-limit handling of the sync
+    client; up to max_concurrent_requests of them are in flight at once.
+    Use as an async context manager, or call aclose when done.
+    """
+
+    def __init__(self, hostname, auth_token, max_concurrent_requests=DEFAULT_ASYNC_CONCURRENCY):
+        self.hostname = hostname
+        self.auth_token = auth_token
+        self.max_concurrent_requests = max_concurrent_requests
+        self.client = create_async_client(
+            hostname,
+            headers={
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {auth_token}",
+            },
+            pool_maxsize=max(DEFAULT_POOL_SIZE, max_concurrent_requests),
+        )
+        self._slots = asyncio.Semaphore(max_concurrent_requests)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self):
+        await self.client.aclose()
+
+    async def search_issues(
+        self,
+        jql,
+        fields=ISSUE_FIELDS,
+        max_results=None,
+        page_size=DEFAULT_PAGE_SIZE,
+    ):
+        """
+        Search Jira issues and return them as a list.
+
+        The first page reveals the total, the remaining pages are fetched
+        concurrently and returned in search order.
+
+        Args:
+            jql: JQL query string
+            fields: Comma-separated list of fields to retrieve
+            max_results: Optional upper bound on the number of returned issues
+            page_size: Number of issues requested per page
+
+        Returns:
+            List of issue dictionaries
+        """
+        first_page = await self._search_page(jql, fields, 0, page_size)
+        issues = first_page.get("issues", [])
+        total = first_page.get("total", len(issues))
+        if max_results is not None:
+            total = min(total, max_results)
+        if issues and len(issues) < total:
+            # The server may cap maxResults below the requested page size
+            page_size = len(issues)
+            pages = await asyncio.gather(*(
+                self._search_page(jql, fields, start_at, page_size)
+                for start_at in range(page_size, total, page_size)
+            ))
+            for page in pages:
+                issues.extend(page.get("issues", []))
+        return issues[:max_results] if max_results is not None else issues
+
+    async def _search_page(self, jql, fields, start_at, page_size):
+        issue_search_endpoint = f"{self.hostname}/rest/api/2/search"
+        issue_params = {
+            "jql": jql,
+            "fields": fields,
+            "startAt": start_at,
+            "maxResults": page_size,
+        }
+        try:
+            async with self._slots:
+                issue_response = await self.client.get(issue_search_endpoint, params=issue_params)
+            issue_response.raise_for_status()
+            return issue_response.json()
+        except httpx.HTTPError as e:
+            raise Exception(f"An error occurred during issue search: {e}")
+        except json.JSONDecodeError:
+            raise Exception(
+                f"Failed to decode JSON. Response text was: {issue_response.text}"
+            )
+
+    async def get_issue(self, issue_key, fields=ISSUE_FIELDS):
+        """
+        Get a single Jira issue by its key.
+
+        Args:
+            issue_key: The issue key (e.g., "PROJ-123")
+            fields: Comma-separated list of fields to retrieve
+
+        Returns:
+            Dictionary containing the issue data
+
+        Raises:
+            Exception: If the issue is not found or an error occurs
+        """
+        issue_endpoint = f"{self.hostname}/rest/api/2/issue/{issue_key}"
+        issue_params = {"fields": fields}
+        try:
+            async with self._slots:
+                issue_response = await self.client.get(issue_endpoint, params=issue_params)
+            issue_response.raise_for_status()
+            return issue_response.json()
+        except httpx.HTTPError as e:
+            raise Exception(f"An error occurred while fetching issue {issue_key}: {e}")
+        except json.JSONDecodeError:
+            raise Exception(
+                f"Failed to decode JSON for issue {issue_key}. Response text was: {issue_response.text}"
+            )
+
+    async def add_comment(self, issue_key, comment_body):
+        add_comment_endpoint = f"{self.hostname}/rest/api/2/issue/{issue_key}/comment"
+        data = {
+            "body": comment_body
+        }
+        try:
+            async with self._slots:
+                response = await self.client.post(add_comment_endpoint, content=json.dumps(data))
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPError as e:
+            error_message = f"An error occurred during adding comment: {e}"
+            try:
+                error_details = response.json()
+                error_message += f"\nResponse details: {json.dumps(error_details, indent=2)}"
+            except (json.JSONDecodeError, UnboundLocalError):
+                error_message += f"\nRaw response text: {response.text if 'response' in locals() else 'No response object'}"
+            raise Exception(error_message)
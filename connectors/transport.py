@@ -0,0 +1,305 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+import requests
+
+try:
+    import httpx
+except ImportError:  # only required by the async clients
+    httpx = None
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = {429, 502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+DEFAULT_TRANSPORT = {
+    "connect_timeout": 5.0,  # seconds to establish a connection
+    "read_timeout": 60.0,  # seconds to wait for response data
+    "max_retries": 4,  # retries after the first attempt
+    "backoff_base": 0.5,  # seconds, doubled per retry
+    "backoff_max": 30.0,  # cap of a single backoff
+    "max_retry_after": 120.0,  # longer Retry-After values are not waited for
+    "rate": 20.0,  # requests per second, 0 disables the limiter
+    "burst": 20,  # requests that may be sent at once
+    "pool_connections": 10,
+    "pool_maxsize": 10,
+}
+
+# hostname -> settings overriding DEFAULT_TRANSPORT
+_host_settings = {}
+_host_settings_lock = threading.Lock()
+
+
+def configure_host(hostname, **settings):
+    """
+    Override transport settings for a host.
+
+    Args:
+        hostname: Host name or base URL of the service
+        settings: Keys of DEFAULT_TRANSPORT with their new values
+    """
+    unknown = set(settings) - set(DEFAULT_TRANSPORT)
+    if unknown:
+        raise ValueError(f"Unknown transport settings: {sorted(unknown)}")
+    host = urlparse(hostname).hostname or hostname
+    with _host_settings_lock:
+        _host_settings.setdefault(host, {}).update(settings)
+
+
+def get_host_settings(hostname, **overrides):
+    """
+    Resolve transport settings for a host.
+
+    Args:
+        hostname: Host name or base URL of the service
+        overrides: Settings taking precedence over the host configuration
+
+    Returns:
+        Dictionary with all DEFAULT_TRANSPORT keys
+    """
+    host = urlparse(hostname).hostname or hostname
+    settings = dict(DEFAULT_TRANSPORT)
+    with _host_settings_lock:
+        settings.update(_host_settings.get(host, {}))
+    settings.update({key: value for key, value in overrides.items() if value is not None})
+    return settings
+
+
+class TokenBucket:
+    """Client-side rate limiter allowing rate requests per second with bursts of burst."""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """
+        Take one token, going into debt if none is available.
+
+        Returns:
+            Seconds the caller has to wait before sending its request
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            return max(0.0, -self.tokens / self.rate)
+
+
+class RetryPolicy:
+    """
+    Timeouts, rate limit, retry decisions and counters shared by the sync and async clients.
+
+    Connection errors, timeouts and 502/503/504 responses of idempotent
+    requests are retried with exponential backoff and full jitter. 429
+    responses are retried for every method, honouring Retry-After.
+    """
+
+    def __init__(self, settings):
+        self.settings = settings
+        self.limiter = TokenBucket(settings["rate"], settings["burst"]) if settings["rate"] > 0 else None
+        self._counters = {"requests": 0, "retries": 0, "rate_limited": 0, "errors": 0, "throttled_seconds": 0.0}
+        self._counters_lock = threading.Lock()
+
+    def count(self, name, value=1):
+        with self._counters_lock:
+            self._counters[name] += value
+
+    def stats(self):
+        """Return request, retry, 429 and error counters and the time spent throttled."""
+        with self._counters_lock:
+            return dict(self._counters)
+
+    def throttle(self):
+        """Count a request and return the seconds to wait before sending it."""
+        self.count("requests")
+        delay = self.limiter.reserve() if self.limiter is not None else 0.0
+        if delay:
+            self.count("throttled_seconds", delay)
+        return delay
+
+    def _backoff(self, attempt):
+        # Full jitter: a random delay up to the exponential bound
+        return random.uniform(0, min(self.settings["backoff_max"], self.settings["backoff_base"] * 2 ** attempt))
+
+    @staticmethod
+    def _retry_after(response):
+        value = response.headers.get("Retry-After")
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+    def error_delay(self, method, url, attempt, error):
+        """
+        Decide whether a failed request is retried.
+
+        Returns:
+            Seconds to wait before the retry, or None to give up
+        """
+        if method.upper() not in IDEMPOTENT_METHODS or attempt >= self.settings["max_retries"]:
+            self.count("errors")
+            return None
+        delay = self._backoff(attempt)
+        logger.warning(f"{method} {url} failed ({error}), retrying in {delay:.1f}s")
+        self.count("retries")
+        return delay
+
+    def response_delay(self, method, url, attempt, response):
+        """
+        Decide whether a response is retried.
+
+        Returns:
+            Seconds to wait before the retry, or None to return the response
+        """
+        if response.status_code not in RETRY_STATUSES:
+            return None
+        if response.status_code == 429:
+            self.count("rate_limited")
+        elif method.upper() not in IDEMPOTENT_METHODS:
+            return None
+        if attempt >= self.settings["max_retries"]:
+            self.count("errors")
+            return None
+        delay = self._backoff(attempt)
+        retry_after = self._retry_after(response)
+        if retry_after is not None:
+            if retry_after > self.settings["max_retry_after"]:
+                self.count("errors")
+                return None
+            delay = max(delay, retry_after)
+        logger.warning(f"{method} {url} returned {response.status_code}, retrying in {delay:.1f}s")
+        self.count("retries")
+        return delay
+
+
+class RetryingSession(requests.Session):
+    """Session with default timeouts, client-side rate limiting and retries, see RetryPolicy."""
+
+    def __init__(self, settings):
+        super().__init__()
+        self.policy = RetryPolicy(settings)
+        self.timeout = (settings["connect_timeout"], settings["read_timeout"])
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=settings["pool_connections"],
+            pool_maxsize=settings["pool_maxsize"],
+        )
+        self.mount("http://", adapter)
+        self.mount("https://", adapter)
+
+    def stats(self):
+        return self.policy.stats()
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        attempt = 0
+        while True:
+            time.sleep(self.policy.throttle())
+            try:
+                response = super().request(method, url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                delay = self.policy.error_delay(method, url, attempt, e)
+                if delay is None:
+                    raise
+            else:
+                delay = self.policy.response_delay(method, url, attempt, response)
+                if delay is None:
+                    return response
+                response.close()
+            attempt += 1
+            time.sleep(delay)
+
+
+class AsyncRetryingClient:
+    """httpx.AsyncClient with the timeouts, rate limiting and retries of RetryingSession."""
+
+    def __init__(self, settings, headers=None):
+        if httpx is None:
+            raise ImportError("The async clients require the httpx package")
+        self.policy = RetryPolicy(settings)
+        self.client = httpx.AsyncClient(
+            headers=headers,
+            timeout=httpx.Timeout(settings["read_timeout"], connect=settings["connect_timeout"]),
+            limits=httpx.Limits(
+                max_connections=settings["pool_maxsize"],
+                max_keepalive_connections=settings["pool_connections"],
+            ),
+        )
+
+    def stats(self):
+        return self.policy.stats()
+
+    async def request(self, method, url, **kwargs):
+        attempt = 0
+        while True:
+            await asyncio.sleep(self.policy.throttle())
+            try:
+                response = await self.client.request(method, url, **kwargs)
+            except (httpx.ConnectError, httpx.TimeoutException) as e:
+                delay = self.policy.error_delay(method, url, attempt, e)
+                if delay is None:
+                    raise
+            else:
+                delay = self.policy.response_delay(method, url, attempt, response)
+                if delay is None:
+                    return response
+                await response.aclose()
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def get(self, url, **kwargs):
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url, **kwargs):
+        return await self.request("POST", url, **kwargs)
+
+    async def put(self, url, **kwargs):
+        return await self.request("PUT", url, **kwargs)
+
+    async def aclose(self):
+        await self.client.aclose()
+
+
+def create_session(hostname, **overrides):
+    """
+    Create a retrying session configured for a host.
+
+    Args:
+        hostname: Base URL of the service
+        overrides: Settings taking precedence over the host configuration
+
+    Returns:
+        RetryingSession instance
+    """
+    return RetryingSession(get_host_settings(hostname, **overrides))
+
+
+def create_async_client(hostname, headers=None, **overrides):
+    """
+    Create a retrying async client configured for a host.
+
+    Args:
+        hostname: Base URL of the service
+        headers: Default request headers
+        overrides: Settings taking precedence over the host configuration
+
+    Returns:
+        AsyncRetryingClient instance
+    """
+    return AsyncRetryingClient(get_host_settings(hostname, **overrides), headers=headers)
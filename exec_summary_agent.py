@@ -2,45 +2,59 @@
 Executive Summary Agent - Generates executive summaries from Jira ticket analysis.
 Creates comprehensive project status reports with achievements, risks, and timelines.
 """
+import argparse
+import hashlib
 import html
 import calendar
-from datetime import datetime, date, timedelta
-from typing import List, Dict, Any, Set
+from collections import defaultdict
+from concurrent.futures import Executor, ThreadPoolExecutor
+from datetime import date, timedelta
+from typing import Iterable, Iterator, List, Dict, Any, Optional, Set, Tuple
 from pydantic import TypeAdapter
 from model.exec_summary import ExecSummary
 from model.exec_summary_timeline import Timeline
 from model.exec_summary_prereq import Prerequisities
 from common_utils import (
-    ConfigManager,
-    DatabaseManager,
-    APIClientManager,
-    AgentFactory,
+    get_config_manager,
+    get_db_manager,
+    get_api_manager,
+    call_agent,
+    get_llm_cache,
+    set_llm_concurrency,
     setup_logging,
-    jinja_env
+    tree_summarize,
+    get_jinja_env,
+    LLM_MAX_CONCURRENCY,
+    OLLAMA_MODEL
 )
 
 # Constants
-ISOFORMAT = "%Y-%m-%dT%H:%M:%S.%f%z"
 SPRINT_LENGTH = 28  # days
 SPRINT_CLOSE_STATES = [
     'Implemented', 'Delivered', 'Done (Accepted)', 
     'Closed', 'Fixed', 'Done', 'verworfen'
 ]
-CHAR_SPLITTER = 3800  # max number of characters for context window
 SUMMARY_MAX_LINES = 5
 SUMMARY_MAX_CHARS = 255
-DEFAULT_YEAR = 2026
+SUMMARY_PARALLELISM = 4  # concurrent summary LLM calls per project
+PROJECT_CONCURRENCY = 1  # projects processed concurrently
+SUMMARY_PROMPT_TEMPLATE = (
+    "Create one line summary of MAXIMUM 255 characters long describing "
+    "highlights, achievements, risks, focus and deliverables from following "
+    "content {ctx}. Return only summary content MAX 255 characters long "
+    "without any other additional information."
+)
 
 # Setup logging
 logger = setup_logging(__name__)
 
 # Initialize managers
-config_manager = ConfigManager()
-db_manager = DatabaseManager(config_manager)
-api_manager = APIClientManager(config_manager)
+# Initialized lazily: Vault and the database are contacted on first use
+config_manager = get_config_manager()
+db_manager = get_db_manager()
+api_manager = get_api_manager()
 
-# Jinja2 template
-exec_template = jinja_env.get_template('exec_summary.html.j2')
+EXEC_TEMPLATE = 'exec_summary.html.j2'
 
 # Type adapter for prerequisites
 PrereqsSetAdapter = TypeAdapter(Set[Prerequisities])
@@ -84,23 +98,50 @@ def load_items() -> List[Dict[str, Any]]:
     return items
 
 
-def load_ticket_context(confluence_id: str) -> List[Dict[str, Any]]:
+def load_ticket_context(
+    confluence_id: str,
+    created_after: Optional[date] = None,
+    statuses: Optional[Iterable[str]] = None,
+    exclude_statuses: bool = False,
+    include_description: bool = True
+) -> List[Dict[str, Any]]:
     """
     Load ticket context from cache for a specific confluence page.
     
+    Filters are evaluated by the database on the creation date prefix and
+    status of the cached metadata, both covered by an expression index.
+    
     Args:
         confluence_id: Confluence page ID
+        created_after: Only load tickets created after this day
+        statuses: Only load tickets in one of these statuses
+        exclude_statuses: If True, load tickets in none of the statuses instead
+        include_description: If False, the description is dropped from the metadata
         
     Returns:
         List of ticket contexts with metadata
     """
     logger.info(f"Loading ticket context for confluence page {confluence_id}")
-    query = """
-        SELECT key, metadata, context 
+    conditions = ["confluence_id=%s"]
+    params = [confluence_id]
+    if created_after is not None:
+        # Jira timestamps start with the ISO date, which compares correctly as text
+        conditions.append("left(metadata->>'created', 10) > %s")
+        params.append(created_after.isoformat())
+    if statuses is not None:
+        if exclude_statuses:
+            conditions.append("(metadata->>'status' IS NULL OR metadata->>'status' <> ALL(%s))")
+        else:
+            conditions.append("metadata->>'status' = ANY(%s)")
+        params.append(list(statuses))
+    metadata = "metadata" if include_description else "metadata - 'description'"
+    query = f"""
+        SELECT key, {metadata}, context 
         FROM devops.crew_pm_cache 
-        WHERE confluence_id=%s;
+        WHERE {' AND '.join(conditions)} 
+        ORDER BY key;
     """
-    rows = db_manager.execute_query(query, (confluence_id,))
+    rows = db_manager.execute_query(query, tuple(params))
     
     items = []
     for row in rows:
@@ -114,6 +155,95 @@ def load_ticket_context(confluence_id: str) -> List[Dict[str, Any]]:
     return items
 
 
+def load_recent_tickets(
+    confluence_id: str,
+    days: int = SPRINT_LENGTH,
+    closed_only: bool = True
+) -> List[Dict[str, Any]]:
+    """
+    Load tickets created within the last days, filtered by status.
+    
+    Args:
+        confluence_id: Confluence page ID
+        days: Number of days to look back
+        closed_only: If True, only load closed tickets, otherwise only open ones
+        
+    Returns:
+        List of ticket contexts
+    """
+    return load_ticket_context(
+        confluence_id,
+        created_after=date.today() - timedelta(days=days),
+        statuses=SPRINT_CLOSE_STATES,
+        exclude_statuses=not closed_only,
+        # Closed tickets are summarized from their context only
+        include_description=not closed_only
+    )
+
+
+def load_timeline_summaries(confluence_id: str) -> Dict[date, Tuple[str, str]]:
+    """
+    Load stored month summaries for a confluence page.
+    
+    Args:
+        confluence_id: Confluence page ID
+        
+    Returns:
+        Dictionary mapping month start dates to (digest, description)
+    """
+    query = """
+        SELECT month_start, digest, description 
+        FROM devops.crew_pm_timeline 
+        WHERE confluence_id=%s;
+    """
+    rows = db_manager.execute_query(query, (confluence_id,))
+    return {row[0]: (row[1], row[2]) for row in rows}
+
+
+def store_timeline_summaries(confluence_id: str, summaries: List[Tuple[date, str, str]]) -> None:
+    """
+    Store month summaries together with the digest of their input.
+    
+    Args:
+        confluence_id: Confluence page ID
+        summaries: List of (month start date, digest, description)
+    """
+    if not summaries:
+        return
+    logger.info(f"Storing {len(summaries)} month summaries for confluence page {confluence_id}")
+    query = """
+        INSERT INTO devops.crew_pm_timeline (confluence_id, month_start, digest, description) 
+        VALUES %s 
+        ON CONFLICT (confluence_id, month_start) 
+        DO UPDATE SET digest=EXCLUDED.digest, description=EXCLUDED.description, updated_at=now()
+    """
+    db_manager.execute_values(
+        query,
+        [(confluence_id, month_start, digest, description) for month_start, digest, description in summaries]
+    )
+
+
+def get_month_digest(context: Set[str]) -> str:
+    """
+    Compute a digest of the ticket contexts summarized for a month.
+    
+    The summary prompt and model are part of the digest, so changing
+    either invalidates stored summaries.
+    
+    Args:
+        context: Set of context strings of the month
+        
+    Returns:
+        Hex digest of the month's summary input
+    """
+    digest = hashlib.sha256()
+    digest.update(f"{OLLAMA_MODEL}\n{SUMMARY_PROMPT_TEMPLATE}\n".encode('utf-8'))
+    for line in sorted(context):
+        digest.update(line.encode('utf-8'))
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+
 def update_confluence(confluence_id: str, item: ExecSummary) -> None:
     """
     Update Confluence page with executive summary.
@@ -125,7 +255,7 @@ def update_confluence(confluence_id: str, item: ExecSummary) -> None:
     logger.info(f"Updating Confluence page {confluence_id}")
     
     template_data = {"item": item}
-    rendered_html = exec_template.render(template_data)
+    rendered_html = get_jinja_env().get_template(EXEC_TEMPLATE).render(template_data)
     
     # Save to file for debugging
     with open("demo.html", "w") as f:
@@ -134,8 +264,10 @@ def update_confluence(confluence_id: str, item: ExecSummary) -> None:
     
     # Update Confluence
     confluence_api = api_manager.get_confluence_api()
-    confluence_api.update_page(confluence_id, rendered_html)
-    logger.info(f"Successfully updated Confluence page {confluence_id}")
+    if confluence_api.update_page(confluence_id, rendered_html):
+        logger.info(f"Successfully updated Confluence page {confluence_id}")
+    else:
+        logger.info(f"Confluence page {confluence_id} is unchanged, skipped publishing")
 
 
 def call_pm_agent(message: str) -> str:
@@ -149,9 +281,7 @@ def call_pm_agent(message: str) -> str:
         Agent response as HTML-escaped string
     """
     logger.debug("Calling PM agent")
-    agent = AgentFactory.create_pm_agent()
-    agent_result = agent(message)
-    return html.escape(agent_result.message['content'][0]['text'])
+    return html.escape(call_agent(message, role='pm'))
 
 
 def call_scrum_agent(message: str) -> str:
@@ -165,9 +295,7 @@ def call_scrum_agent(message: str) -> str:
         Agent response as HTML-escaped string
     """
     logger.debug("Calling scrum agent")
-    agent = AgentFactory.create_scrum_agent()
-    agent_result = agent(message)
-    return html.escape(agent_result.message['content'][0]['text'])
+    return html.escape(call_agent(message, role='scrum'))
 
 
 def recursive_summary(content: Set[str]) -> str:
@@ -181,116 +309,146 @@ def recursive_summary(content: Set[str]) -> str:
         Summary string
     """
     logger.debug("Creating recursive summary")
-    ctx = ""
-    prompt_template = (
-        "Create one line summary of MAXIMUM 255 characters long describing "
-        "highlights, achievements, risks, focus and deliverables from following "
-        "content {ctx}. Return only summary content MAX 255 characters long "
-        "without any other additional information."
-    )
     
-    for line in content:
-        if len(ctx) + len(line) > CHAR_SPLITTER:
-            ctx = call_pm_agent(prompt_template.format(ctx=ctx))
-        ctx += line
+    # Sorted so identical content always produces identical prompts
+    return tree_summarize(
+        sorted(content),
+        summarize=lambda ctx: call_pm_agent(SUMMARY_PROMPT_TEMPLATE.format(ctx=ctx))
+    )
+
+def iter_months(first: Tuple[int, int], last: Tuple[int, int]) -> Iterator[Tuple[int, int]]:
+    """
+    Iterate over calendar months between two months, both inclusive.
     
-    return call_pm_agent(prompt_template.format(ctx=ctx))
+    Args:
+        first: (year, month) to start with
+        last: (year, month) to end with
+        
+    Yields:
+        (year, month) tuples in chronological order
+    """
+    year, month = first
+    while (year, month) <= last:
+        yield year, month
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
 
-def create_timeline(tickets: List[Dict[str, Any]], year: int = DEFAULT_YEAR) -> Set[Timeline]:
+
+def create_timeline(
+    tickets: List[Dict[str, Any]],
+    year: Optional[int] = None,
+    executor: Optional[Executor] = None,
+    confluence_id: Optional[str] = None
+) -> Set[Timeline]:
     """
     Create timeline from tickets.
     
+    Tickets are bucketed by the month they were created in, parsing each
+    creation date once. Without a year the timeline spans every month from
+    the earliest ticket up to the current month, across year boundaries.
+    
+    With a confluence_id, month descriptions are stored with a digest of
+    their input and reused while the digest matches, so only months whose
+    tickets changed are summarized again.
+    
     Args:
         tickets: List of ticket contexts
-        year: Year for timeline
+        year: Optional year to restrict the timeline to
+        executor: Optional executor used to summarize months concurrently
+        confluence_id: Optional Confluence page ID used to memoize summaries
         
     Returns:
         Set of Timeline objects
     """
-    logger.info(f"Creating timeline for year {year}")
-    result = set()
+    logger.info(f"Creating timeline for {year if year is not None else 'all years'}")
+    
+    # Bucket ticket context by creation month
+    buckets = defaultdict(set)
+    for ticket in tickets:
+        created = ticket['metadata'].get('created')
+        if not created:
+            continue
+        # ISO timestamps start with the date, so only that part is parsed
+        created_date = date.fromisoformat(created[:10])
+        if year is not None and created_date.year != year:
+            continue
+        buckets[(created_date.year, created_date.month)].add(
+            ticket['context']['focus'] + 
+            ticket['context']['achievements'] + 
+            ticket['context']['deliverable']
+        )
+    
+    # Determine the months covered by the timeline
+    if year is not None:
+        first, last = (year, 1), (year, 12)
+    elif buckets:
+        today = date.today()
+        first, last = min(buckets), max(max(buckets), (today.year, today.month))
+    else:
+        logger.info("No tickets found, timeline is empty")
+        return set()
     
     # Create monthly timeline entries
-    for month in range(1, 13):
-        _, num_days = calendar.monthrange(year, month)
-        result.add(Timeline(
-            start_date=date(year, month, 1),
-            end_date=date(year, month, num_days),
+    result = set()
+    for month_year, month in iter_months(first, last):
+        _, num_days = calendar.monthrange(month_year, month)
+        entry = Timeline(
+            start_date=date(month_year, month, 1),
+            end_date=date(month_year, month, num_days),
             description="",
             metadata=set(),
             context=set()
-        ))
+        )
+        entry.context.update(buckets.get((month_year, month), ()))
+        result.add(entry)
     
-    # Populate timeline with ticket data
-    for ticket in tickets:
-        created_date = datetime.strptime(ticket['metadata']['created'], ISOFORMAT).date()
-        for month in result:
-            if month.start_date < created_date < month.end_date:
-                context_str = (
-                    ticket['context']['focus'] + 
-                    ticket['context']['achievements'] + 
-                    ticket['context']['deliverable']
-                )
-                month.context.add(context_str)
-    
-    # Generate descriptions for each month
+    # Reuse stored descriptions of months whose input did not change
+    stored = load_timeline_summaries(confluence_id) if confluence_id is not None else {}
+    months = []
     for month in result:
-        if month.context:
+        if not month.context:
+            continue
+        digest = get_month_digest(month.context)
+        stored_digest, stored_description = stored.get(month.start_date, (None, None))
+        if stored_digest == digest:
+            month.description = stored_description
+        else:
+            months.append((month, digest))
+    logger.info(f"Summarizing {len(months)} changed months")
+    
+    # Generate descriptions for the remaining months
+    if executor is None:
+        for month, _ in months:
             month.description = recursive_summary(month.context)
+    else:
+        futures = [(month, executor.submit(recursive_summary, month.context)) for month, _ in months]
+        for month, future in futures:
+            month.description = future.result()
+    
+    if confluence_id is not None:
+        store_timeline_summaries(
+            confluence_id,
+            [(month.start_date, digest, month.description) for month, digest in months]
+        )
     
     logger.info(f"Created timeline with {len(result)} months")
     return result
 
-def filter_recent_tickets(
-    tickets: List[Dict[str, Any]], 
-    days: int = SPRINT_LENGTH,
-    closed_only: bool = True
-) -> List[Dict[str, Any]]:
-    """
-    Filter tickets by date and status.
-    
-    Args:
-        tickets: List of ticket contexts
-        days: Number of days to look back
-        closed_only: If True, only include closed tickets
-        
-    Returns:
-        Filtered list of tickets
-    """
-    cutoff_date = date.today() - timedelta(days=days)
-    filtered = []
-    
-    for ticket in tickets:
-        created_date = datetime.strptime(ticket['metadata']['created'], ISOFORMAT).date()
-        if created_date > cutoff_date:
-            status = ticket['metadata']['status']
-            if closed_only:
-                if status in SPRINT_CLOSE_STATES:
-                    filtered.append(ticket)
-            else:
-                if status not in SPRINT_CLOSE_STATES:
-                    filtered.append(ticket)
-    
-    return filtered
-
 def summarize_achievements(tickets: List[Dict[str, Any]]) -> Set[str]:
     """
     Summarize achievements from recent closed tickets.
     
     Args:
-        tickets: List of ticket contexts
+        tickets: Recent closed ticket contexts
         
     Returns:
         Set of achievement summaries
     """
     logger.info("Summarizing achievements")
-    recent_tickets = filter_recent_tickets(tickets, closed_only=True)
-    
-    if not recent_tickets:
+    if not tickets:
         logger.info("No recent closed tickets found")
         return set()
     
-    ctx = "".join(ticket['context']['achievements'] for ticket in recent_tickets)
+    ctx = "".join(ticket['context']['achievements'] for ticket in tickets)
     
     prompt = (
         f"Summarize and highlight achievements in {SUMMARY_MAX_LINES} lines, "
@@ -308,19 +466,17 @@ def summarize_focus(tickets: List[Dict[str, Any]]) -> Set[str]:
     Summarize focus areas from recent closed tickets.
     
     Args:
-        tickets: List of ticket contexts
+        tickets: Recent closed ticket contexts
         
     Returns:
         Set of focus summaries
     """
     logger.info("Summarizing focus areas")
-    recent_tickets = filter_recent_tickets(tickets, closed_only=True)
-    
-    if not recent_tickets:
+    if not tickets:
         logger.info("No recent closed tickets found")
         return set()
     
-    ctx = "".join(ticket['context']['focus'] for ticket in recent_tickets)
+    ctx = "".join(ticket['context']['focus'] for ticket in tickets)
     
     prompt = (
         f"Summarize the focus items which were taken in last sprint in {SUMMARY_MAX_LINES} lines, "
@@ -338,20 +494,18 @@ def summarize_next_steps(tickets: List[Dict[str, Any]]) -> Set[str]:
     Summarize next steps from recent open tickets.
     
     Args:
-        tickets: List of ticket contexts
+        tickets: Recent open ticket contexts
         
     Returns:
         Set of next step summaries
     """
     logger.info("Summarizing next steps")
-    recent_tickets = filter_recent_tickets(tickets, closed_only=False)
-    
-    if not recent_tickets:
+    if not tickets:
         logger.info("No recent open tickets found")
         return set()
     
     ctx = ""
-    for ticket in recent_tickets:
+    for ticket in tickets:
         ctx += ticket['metadata']['title']
         if ticket['metadata']['description'] is not None:
             ctx += ticket['metadata']['description']
@@ -372,20 +526,18 @@ def summarize_risks(tickets: List[Dict[str, Any]]) -> Set[str]:
     Summarize risks from recent open tickets.
     
     Args:
-        tickets: List of ticket contexts
+        tickets: Recent open ticket contexts
         
     Returns:
         Set of risk summaries
     """
     logger.info("Summarizing risks")
-    recent_tickets = filter_recent_tickets(tickets, closed_only=False)
-    
-    if not recent_tickets:
+    if not tickets:
         logger.info("No recent open tickets found")
         return set()
     
     ctx = ""
-    for ticket in recent_tickets:
+    for ticket in tickets:
         ctx += ticket['metadata']['title']
         if ticket['metadata']['description'] is not None:
             ctx += ticket['metadata']['description']
@@ -401,21 +553,44 @@ def summarize_risks(tickets: List[Dict[str, Any]]) -> Set[str]:
     logger.info(f"Generated {len(result)} risk summaries")
     return set(result)
 
-def process_executive_summary(item: Dict[str, Any]) -> ExecSummary:
+def process_executive_summary(item: Dict[str, Any], parallelism: int = SUMMARY_PARALLELISM) -> ExecSummary:
     """
     Process executive summary for a project item.
     
+    The four section summaries and the per-month timeline summaries are
+    independent LLM calls and run concurrently, at most parallelism at a time.
+    
     Args:
         item: Project item configuration
+        parallelism: Maximum number of concurrent summary calls
         
     Returns:
         ExecSummary object
     """
     logger.info(f"Processing executive summary for project: {item['title']}")
     
-    # Load ticket contexts
-    tickets = load_ticket_context(item["confluence"])
-    logger.info(f"Loaded {len(tickets)} tickets for analysis")
+    # Load only the rows each section needs
+    closed_tickets = load_recent_tickets(item["confluence"], closed_only=True)
+    open_tickets = load_recent_tickets(item["confluence"], closed_only=False)
+    tickets = load_ticket_context(item["confluence"], include_description=False)
+    logger.info(
+        f"Loaded {len(tickets)} tickets for analysis, "
+        f"{len(closed_tickets)} recently closed and {len(open_tickets)} recently opened"
+    )
+    
+    with ThreadPoolExecutor(max_workers=max(1, parallelism), thread_name_prefix="summary") as executor:
+        # Submit section summaries first so they overlap with the timeline
+        achievements = executor.submit(summarize_achievements, closed_tickets)
+        focus = executor.submit(summarize_focus, closed_tickets)
+        next_steps = executor.submit(summarize_next_steps, open_tickets)
+        risks = executor.submit(summarize_risks, open_tickets)
+        timeline = create_timeline(tickets, executor=executor, confluence_id=item["confluence"])
+        
+        # Collect section summaries
+        achievements = sorted(set(filter(None, achievements.result())))
+        focus = sorted(set(filter(None, focus.result())))
+        next_steps = sorted(set(filter(None, next_steps.result())))
+        risks = sorted(set(filter(None, risks.result())))
     
     # Create base executive summary object
     exec_summary_obj = ExecSummary(
@@ -435,16 +610,22 @@ def process_executive_summary(item: Dict[str, Any]) -> ExecSummary:
         next_steps=set(),
         risks=set(),
         decisions=set(),
-        timeline=create_timeline(tickets),
+        timeline=timeline,
         links=set(),
         raci=set(),
     )
     
-    # Generate summaries using AI agents
-    exec_summary_obj.achievements = sorted(set(filter(None, summarize_achievements(tickets))))
-    exec_summary_obj.focus = sorted(set(filter(None, summarize_focus(tickets))))
-    exec_summary_obj.next_steps = sorted(set(filter(None, summarize_next_steps(tickets))))
-    exec_summary_obj.risks = sorted(set(filter(None, summarize_risks(tickets))))
+    exec_summary_obj.achievements = achievements
+    exec_summary_obj.focus = focus
+    exec_summary_obj.next_steps = next_steps
+    exec_summary_obj.risks = risks
+    
+    # Sort deliverables and prerequisites so unchanged input renders identically
+    exec_summary_obj.deliverables = sorted(exec_summary_obj.deliverables)
+    exec_summary_obj.prerequisites = sorted(
+        exec_summary_obj.prerequisites,
+        key=lambda item: (item.duedate, item.name, item.desc, item.accountable, item.status)
+    )
     
     # Sort timeline
     exec_summary_obj.timeline = sorted(
@@ -466,33 +647,90 @@ def process_executive_summary(item: Dict[str, Any]) -> ExecSummary:
         f"<a href='{item['confluence_architecture']}'>Platform architecture</a>"
     )
     
+    exec_summary_obj.links = sorted(exec_summary_obj.links)
+    
     logger.info(f"Completed executive summary for project: {item['title']}")
     return exec_summary_obj
 
-if __name__ == "__main__":
+def process_project(item: Dict[str, Any], parallelism: int = SUMMARY_PARALLELISM) -> bool:
+    """
+    Generate and publish the executive summary of one project.
+    
+    Args:
+        item: Project item configuration
+        parallelism: Maximum number of concurrent summary calls
+        
+    Returns:
+        True if successful, False otherwise
+    """
+    try:
+        exec_summary = process_executive_summary(item, parallelism=parallelism)
+        update_confluence(item["confluence"], exec_summary)
+        return True
+    except Exception as e:
+        logger.error(f"Failed to process project {item['title']}: {e}")
+        return False
+
+
+def run(
+    parallelism: int = SUMMARY_PARALLELISM,
+    project_concurrency: int = PROJECT_CONCURRENCY
+) -> Dict[str, int]:
+    """
+    Run the executive summary flow for all project items.
+    
+    Args:
+        parallelism: Maximum number of concurrent summary calls per project
+        project_concurrency: Number of projects processed concurrently
+        
+    Returns:
+        Overall statistics
+    """
     logger.info("Starting executive summary flow")
     items = load_items()
     
     if not items:
         logger.warning("No project items found")
     
-    # Process each project item
-    processed = 0
-    failed = 0
-    
-    for item in items:
-        try:
-            exec_summary = process_executive_summary(item)
-            update_confluence(item["confluence"], exec_summary)
-            processed += 1
-        except Exception as e:
-            logger.error(f"Failed to process project {item['title']}: {e}")
-            failed += 1
+    # Process project items, LLM calls are additionally capped by --llm-concurrency if set
+    with ThreadPoolExecutor(max_workers=max(1, project_concurrency), thread_name_prefix="summary-project") as executor:
+        results = list(executor.map(lambda item: process_project(item, parallelism), items))
     
     stats = {
         'projects': len(items),
-        'processed': processed,
-        'failed': failed
+        'processed': results.count(True),
+        'failed': results.count(False)
     }
     
-    logger.info(f"Executive summary flow complete: {stats}")
\ No newline at end of file
+    logger.info(f"Executive summary flow complete: {stats}")
+    if get_llm_cache() is not None:
+        logger.info(f"LLM cache statistics: {get_llm_cache().stats()}")
+    logger.info(f"HTTP transport statistics: {api_manager.transport_stats()}")
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate executive summaries and publish them to Confluence.")
+    parser.add_argument(
+        "--parallelism",
+        type=int,
+        default=SUMMARY_PARALLELISM,
+        help=f"maximum concurrent summary LLM calls per project (default: {SUMMARY_PARALLELISM})"
+    )
+    parser.add_argument(
+        "--projects",
+        type=int,
+        default=PROJECT_CONCURRENCY,
+        help=f"number of projects processed concurrently (default: {PROJECT_CONCURRENCY})"
+    )
+    parser.add_argument(
+        "--llm-concurrency",
+        type=int,
+        default=LLM_MAX_CONCURRENCY,
+        help="maximum in-flight LLM calls of the process, 0 leaves it to the worker settings "
+             f"(default: {LLM_MAX_CONCURRENCY})"
+    )
+    args = parser.parse_args()
+    set_llm_concurrency(args.llm_concurrency)
+    
+    run(parallelism=args.parallelism, project_concurrency=args.projects)
@@ -2,31 +2,106 @@
 Scrum Agent - Analyzes Jira tickets and stores context for executive summaries.
 Uses AI agents to extract structured information from Jira tickets.
 """
+import argparse
+import hashlib
 import json
-from typing import List, Dict, Any, Set
-from strands.types.exceptions import StructuredOutputException, MaxTokensReachedException
-from tools.strands_limit_hook import LimitToolCounts
+import os
+import re
+import socket
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from itertools import chain, islice
+from typing import Callable, Iterable, Iterator, List, Dict, Any, Optional, Set, Tuple
 from model.jira_context import JiraContext
 from common_utils import (
-    ConfigManager,
-    DatabaseManager,
-    APIClientManager,
-    AgentFactory,
+    get_config_manager,
+    get_db_manager,
+    get_api_manager,
+    BatchWriter,
+    call_agent,
+    get_llm_cache,
+    set_llm_concurrency,
     setup_logging,
-    OLLAMA_MAX_TOKENS
+    truncate_tokens,
+    LLM_MAX_CONCURRENCY,
+    OLLAMA_MAX_TOKENS,
+    JIRA_PAGE_SIZE
 )
 
 # Constants
-MAX_DESCRIPTION_LENGTH = 2048
+MAX_DESCRIPTION_TOKENS = 512
 MAX_TOOL_COUNTS = {"sleep": 3}
+ANALYSIS_WORKERS = 4  # concurrent LLM analyses, match the Ollama host's OLLAMA_NUM_PARALLEL
+PROJECT_CONCURRENCY = 1  # projects processed concurrently
+ISOFORMAT = "%Y-%m-%dT%H:%M:%S.%f%z"
+JQL_DATE_FORMAT = "%Y/%m/%d %H:%M"
+SYNC_OVERLAP = timedelta(hours=24)  # covers Jira user timezone offsets and minute precision
+FINGERPRINT_FIELDS = (
+    'summary', 'description', 'priority', 'assignee',
+    'labels', 'components', 'team', 'created'
+)
+CONTEXT_UPSERT_QUERY = """
+    INSERT INTO devops.crew_pm_cache (key, confluence_id, context, metadata, fingerprint) 
+    VALUES %s 
+    ON CONFLICT (key, confluence_id) 
+    DO UPDATE SET context=EXCLUDED.context, metadata=EXCLUDED.metadata, fingerprint=EXCLUDED.fingerprint
+"""
+METADATA_REFRESH_QUERY = """
+    UPDATE devops.crew_pm_cache AS c 
+    SET metadata=v.metadata::jsonb, fingerprint=v.fingerprint 
+    FROM (VALUES %s) AS v(key, confluence_id, metadata, fingerprint) 
+    WHERE c.key=v.key AND c.confluence_id=v.confluence_id 
+      AND (c.metadata IS DISTINCT FROM v.metadata::jsonb OR c.fingerprint IS DISTINCT FROM v.fingerprint)
+"""
+QUEUE_LEASE_SECONDS = 120  # a claimed ticket is reassigned if its lease is not extended within this time
+QUEUE_HEARTBEAT_SECONDS = 30  # interval at which the leases of tickets in progress are extended
+QUEUE_MAX_ATTEMPTS = 3
+# Set INGEST_WORKER_ID to a name unique per running worker but stable across restarts
+# (e.g. the pod name) to resume the worker's own in-flight tickets without waiting for the lease
+QUEUE_WORKER_ID = os.getenv('INGEST_WORKER_ID') or f"{socket.gethostname()}:{os.getpid()}"
+QUEUE_ENQUEUE_QUERY = """
+    INSERT INTO devops.crew_pm_ingest_queue AS q (project_id, key, ticket) 
+    VALUES %s 
+    ON CONFLICT (project_id, key) 
+    DO UPDATE SET ticket=EXCLUDED.ticket, state='pending', attempts=0, worker=NULL, lease_until=NULL, 
+                  last_error=NULL, enqueued_at=now(), updated_at=now() 
+    WHERE q.ticket IS DISTINCT FROM EXCLUDED.ticket
+"""
+QUEUE_CLAIM_QUERY = """
+    UPDATE devops.crew_pm_ingest_queue AS q 
+    SET state='in_flight', attempts=q.attempts + 1, worker=%s, 
+        lease_until=now() + %s * interval '1 second', updated_at=now() 
+    FROM (
+        SELECT id 
+        FROM devops.crew_pm_ingest_queue 
+        WHERE project_id=%s AND attempts < %s 
+          AND (state='pending' OR (state='in_flight' AND (lease_until < now() OR worker=%s))) 
+          AND id <> ALL(%s) 
+        ORDER BY id 
+        LIMIT %s 
+        FOR UPDATE SKIP LOCKED
+    ) AS c 
+    WHERE q.id=c.id 
+    RETURNING q.id, q.ticket
+"""
+QUEUE_FAIL_QUERY = """
+    UPDATE devops.crew_pm_ingest_queue AS q 
+    SET state=CASE WHEN q.attempts >= v.max_attempts THEN 'failed' ELSE 'pending' END, 
+        worker=NULL, lease_until=NULL, last_error=v.error, updated_at=now() 
+    FROM (VALUES %s) AS v(id, error, max_attempts, worker) 
+    WHERE q.id=v.id AND q.state='in_flight' AND q.worker=v.worker
+"""
 
 # Setup logging
 logger = setup_logging(__name__)
 
 # Initialize managers
-config_manager = ConfigManager()
-db_manager = DatabaseManager(config_manager)
-api_manager = APIClientManager(config_manager)
+# Initialized lazily: Vault and the database are contacted on first use
+config_manager = get_config_manager()
+db_manager = get_db_manager()
+api_manager = get_api_manager()
 
 
 def load_items() -> List[Dict[str, Any]]:
@@ -63,23 +138,56 @@ def load_items() -> List[Dict[str, Any]]:
     return items
 
 
-def get_cached_keys() -> Set[str]:
+def get_cached_fingerprints(confluence_id: str, keys: List[str]) -> Dict[str, Optional[str]]:
     """
-    Get list of already cached Jira ticket keys.
+    Get cached fingerprints for a batch of Jira ticket keys of one project.
     
+    Args:
+        confluence_id: Confluence page ID the cache entries belong to
+        keys: Candidate ticket keys to look up
+        
     Returns:
-        Set of cached ticket keys.
+        Dictionary mapping cached ticket keys to their fingerprint
+        (None for rows cached before fingerprints were introduced).
     """
-    logger.info("Retrieving cached ticket keys")
-    query = "SELECT key FROM devops.crew_pm_cache"
-    rows = db_manager.execute_query(query)
+    if not keys:
+        return {}
+    query = """
+        SELECT key, fingerprint 
+        FROM devops.crew_pm_cache 
+        WHERE confluence_id=%s AND key = ANY(%s)
+    """
+    rows = db_manager.execute_query(query, (confluence_id, list(keys)))
     
-    keys = {row[0] for row in rows}
-    logger.info(f"Found {len(keys)} cached tickets")
-    return keys
+    fingerprints = {row[0]: row[1] for row in rows}
+    logger.debug(f"Found {len(fingerprints)} of {len(keys)} tickets in cache")
+    return fingerprints
+
+
+def iter_batches(iterable: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """
+    Split an iterable into lists of at most size elements.
+    
+    Args:
+        iterable: Items to split, consumed lazily
+        size: Maximum batch size
+        
+    Yields:
+        Consecutive batches of items
+    """
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
 
 
-def store_context(key: str, confluence_id: str, content: str, metadata: str) -> None:
+def store_context(
+    key: str,
+    confluence_id: str,
+    content: str,
+    metadata: str,
+    fingerprint: str,
+    writer: Optional[BatchWriter] = None
+) -> None:
     """
     Store ticket context in database cache.
     
@@ -88,34 +196,241 @@ def store_context(key: str, confluence_id: str, content: str, metadata: str) ->
         confluence_id: Confluence page ID
         content: Analyzed context content
         metadata: Ticket metadata as JSON string
+        fingerprint: Fingerprint of the ticket content that was analyzed
+        writer: Optional batch writer; when given the row is buffered and
+            written together with other tickets
     """
+    row = (key, confluence_id, content, metadata, fingerprint)
+    if writer is not None:
+        logger.debug(f"Buffering context for ticket {key}")
+        writer.add(row)
+        return
     logger.info(f"Storing context for ticket {key}")
-    query = """
-        INSERT INTO devops.crew_pm_cache (key, confluence_id, context, metadata) 
-        VALUES (%s, %s, %s, %s) 
-        ON CONFLICT (key, confluence_id) 
-        DO UPDATE SET context=%s, metadata=%s
-    """
-    db_manager.execute_query(
-        query,
-        (key, confluence_id, content, metadata, content, metadata),
-        fetch=False
-    )
+    db_manager.execute_values(CONTEXT_UPSERT_QUERY, [row])
     logger.info(f"Successfully stored context for ticket {key}")
 
 
-def trim_ticket_description(ticket: Dict[str, Any], max_length: int = MAX_DESCRIPTION_LENGTH) -> None:
+def refresh_metadata(
+    key: str,
+    confluence_id: str,
+    metadata: str,
+    fingerprint: str,
+    writer: Optional[BatchWriter] = None
+) -> None:
+    """
+    Update cached ticket metadata without touching the analyzed context.
+    
+    Rows whose metadata and fingerprint are already current are left alone.
+    
+    Args:
+        key: Jira ticket key
+        confluence_id: Confluence page ID
+        metadata: Ticket metadata as JSON string
+        fingerprint: Fingerprint of the ticket content
+        writer: Optional batch writer; when given the update is buffered
+    """
+    row = (key, confluence_id, metadata, fingerprint)
+    if writer is not None:
+        writer.add(row)
+        return
+    db_manager.execute_values(METADATA_REFRESH_QUERY, [row])
+
+
+def create_context_writer(on_flush: Optional[Callable[[List[tuple]], None]] = None) -> BatchWriter:
+    """
+    Create a batch writer for analyzed ticket contexts.
+    
+    Args:
+        on_flush: Optional callback receiving the rows of every successful write
+        
+    Returns:
+        BatchWriter upserting rows into the context cache
+    """
+    return BatchWriter(db_manager, CONTEXT_UPSERT_QUERY, key_func=lambda row: row[:2], on_flush=on_flush)
+
+
+def create_metadata_writer(on_flush: Optional[Callable[[List[tuple]], None]] = None) -> BatchWriter:
+    """
+    Create a batch writer for metadata-only refreshes.
+    
+    Args:
+        on_flush: Optional callback receiving the rows of every successful write
+        
+    Returns:
+        BatchWriter updating metadata of cached tickets
+    """
+    return BatchWriter(db_manager, METADATA_REFRESH_QUERY, key_func=lambda row: row[:2], on_flush=on_flush)
+
+
+def compute_fingerprint(ticket: Dict[str, Any], project_title: str) -> str:
+    """
+    Compute a stable fingerprint of the ticket content used for analysis.
+    
+    Status and timestamps that change without touching the content are
+    left out, so workflow transitions do not trigger a new LLM analysis.
+    
+    Args:
+        ticket: Jira ticket dictionary
+        project_title: Project title used in the analysis prompt
+        
+    Returns:
+        Hex digest of the analyzed content
+    """
+    fields = ticket.get('fields', {})
+    content = {
+        "key": ticket['key'],
+        "project": project_title,
+        "fields": {name: fields.get(name) for name in FINGERPRINT_FIELDS}
+    }
+    serialized = json.dumps(content, sort_keys=True, default=str)
+    return hashlib.sha256(serialized.encode('utf-8')).hexdigest()
+
+
+def get_jql_hash(item: Dict[str, Any]) -> str:
+    """
+    Get a stable hash of the project's JQL queries.
+    
+    Args:
+        item: Project item configuration
+        
+    Returns:
+        Hex digest identifying the sprint and summary JQL combination
+    """
+    jql = f"{item['sprint_jql']}\n{item['jql']}"
+    return hashlib.sha256(jql.encode('utf-8')).hexdigest()
+
+
+def get_sync_mark(item: Dict[str, Any]) -> Optional[datetime]:
+    """
+    Get the high-water mark of the last successful sync for a project.
+    
+    The mark is ignored when the project's JQL changed since it was stored,
+    so a modified query always triggers a full sync.
+    
+    Args:
+        item: Project item configuration
+        
+    Returns:
+        Last seen 'updated' timestamp, or None if a full sync is needed
+    """
+    query = """
+        SELECT last_updated, jql_hash 
+        FROM devops.crew_pm_sync 
+        WHERE project_id=%s;
+    """
+    rows = db_manager.execute_query(query, (item['id'],))
+    if not rows or rows[0][0] is None:
+        logger.info(f"No sync mark for project {item['title']}, running full sync")
+        return None
+    if rows[0][1] != get_jql_hash(item):
+        logger.info(f"JQL changed for project {item['title']}, running full sync")
+        return None
+    logger.info(f"Sync mark for project {item['title']}: {rows[0][0]}")
+    return rows[0][0]
+
+
+def store_sync_mark(item: Dict[str, Any], mark: datetime) -> None:
+    """
+    Store the high-water mark for a project.
+    
+    Args:
+        item: Project item configuration
+        mark: Latest 'updated' timestamp that was fully processed
+    """
+    logger.info(f"Storing sync mark {mark} for project {item['title']}")
+    query = """
+        INSERT INTO devops.crew_pm_sync (project_id, jql_hash, last_updated) 
+        VALUES (%s, %s, %s) 
+        ON CONFLICT (project_id) 
+        DO UPDATE SET jql_hash=EXCLUDED.jql_hash, last_updated=EXCLUDED.last_updated
+    """
+    db_manager.execute_query(query, (item['id'], get_jql_hash(item), mark), fetch=False)
+
+
+def split_order_by(jql: str) -> Tuple[str, str]:
+    """
+    Split a JQL query into its condition and ORDER BY clause.
+    
+    Args:
+        jql: JQL query, optionally with ORDER BY clause
+        
+    Returns:
+        Tuple of the condition and the ORDER BY clause with a leading space,
+        or an empty string if there is none
+    """
+    match = re.search(r'\border\s+by\b', jql, re.IGNORECASE)
+    if match:
+        return jql[:match.start()].strip(), " " + jql[match.start():].strip()
+    return jql.strip(), ""
+
+
+def apply_updated_since(jql: str, mark: Optional[datetime]) -> str:
+    """
+    Restrict a JQL query to tickets updated since the given mark.
+    
+    Args:
+        jql: Original JQL query, optionally with ORDER BY clause
+        mark: High-water mark, or None to keep the query unchanged
+        
+    Returns:
+        JQL query limited to recently updated tickets
+    """
+    if mark is None:
+        return jql
+    since = (mark - SYNC_OVERLAP).astimezone().strftime(JQL_DATE_FORMAT)
+    condition, order_by = split_order_by(jql)
+    return f'({condition}) AND updated >= "{since}"{order_by}'
+
+
+def restrict_to_keys(jql: str, keys: Iterable[str]) -> str:
+    """
+    Restrict a JQL query to the given ticket keys.
+    
+    Args:
+        jql: Original JQL query, optionally with ORDER BY clause
+        keys: Jira ticket keys
+        
+    Returns:
+        JQL query matching only those of the keys the original query matches
+    """
+    condition, order_by = split_order_by(jql)
+    return f'({condition}) AND key in ({", ".join(sorted(keys))}){order_by}'
+
+
+def get_ticket_updated(ticket: Dict[str, Any]) -> Optional[datetime]:
+    """
+    Parse the 'updated' timestamp of a Jira ticket.
+    
+    Args:
+        ticket: Jira ticket dictionary
+        
+    Returns:
+        Timezone-aware timestamp, or None if missing or malformed
+    """
+    updated = ticket.get('fields', {}).get('updated')
+    if not updated:
+        return None
+    try:
+        return datetime.strptime(updated, ISOFORMAT)
+    except ValueError:
+        logger.warning(f"Unparsable updated timestamp for {ticket['key']}: {updated}")
+        return None
+
+
+def trim_ticket_description(ticket: Dict[str, Any], max_tokens: int = MAX_DESCRIPTION_TOKENS) -> None:
     """
     Trim ticket description to fit context window.
     
     Args:
         ticket: Jira ticket dictionary
-        max_length: Maximum description length
+        max_tokens: Maximum description length in tokens
     """
     description = ticket.get('fields', {}).get('description')
-    if description and len(description) > max_length:
-        ticket['fields']['description'] = description[:max_length]
-        logger.debug(f"Trimmed description for {ticket['key']} to {max_length} characters")
+    if description:
+        trimmed = truncate_tokens(description, max_tokens)
+        if trimmed != description:
+            ticket['fields']['description'] = trimmed
+            logger.debug(f"Trimmed description for {ticket['key']} to {max_tokens} tokens")
 
 
 def extract_ticket_metadata(ticket: Dict[str, Any]) -> Dict[str, Any]:
@@ -168,10 +483,9 @@ def analyze_ticket_with_agent(ticket: Dict[str, Any], project_title: str) -> Jir
     """
     logger.info(f"Analyzing ticket {ticket['key']} with AI agent")
     
-    # Create LLM and agent
-    llm = AgentFactory.create_ollama_model(max_tokens=OLLAMA_MAX_TOKENS)
-    limit_hook = LimitToolCounts(max_tool_counts=MAX_TOOL_COUNTS)
-    agent = AgentFactory.create_scrum_agent(model=llm, hooks=[limit_hook])
+    # Serialized deterministically: tickets read back from the jsonb queue have
+    # their keys reordered, which must not change the prompt and its cache entry
+    ticket_json = json.dumps(ticket, sort_keys=True, ensure_ascii=False)
     
     # Prepare prompt
     prompt = f"""
@@ -186,43 +500,76 @@ def analyze_ticket_with_agent(ticket: Dict[str, Any], project_title: str) -> Jir
     focus: str = Field(description="The main focus area of this ticket (e.g., bug fix, new feature, backend, frontend, etc.).")
     risks: str = Field(description="Any potential risks that could arise from or are highlighted by this ticket.")
     DO NOT include anything else to your answer apart from valid json for given pydantic schema.
-    Given the following jira issue {ticket} provide only the result json.
+    Given the following jira issue {ticket_json} provide only the result json.
     """
     
-    # Execute agent
-    response = agent(
+    # Execute pooled agent, reusing cached responses for identical prompts
+    context = call_agent(
         prompt,
+        role='scrum',
         structured_output_model=JiraContext,
-        hooks=[limit_hook]
+        max_tokens=OLLAMA_MAX_TOKENS,
+        max_tool_counts=MAX_TOOL_COUNTS
     )
     
     logger.info(f"Successfully analyzed ticket {ticket['key']}")
-    return response.structured_output
+    return context
 
 def process_ticket(
     ticket: Dict[str, Any],
     item: Dict[str, Any],
-    cached_keys: Set[str]
-) -> bool:
+    cached_fingerprints: Dict[str, Optional[str]],
+    context_writer: Optional[BatchWriter] = None,
+    metadata_writer: Optional[BatchWriter] = None
+) -> Tuple[str, Optional[str]]:
     """
-    Process a single Jira ticket if not already cached.
+    Process a single Jira ticket if its content is not cached yet or changed.
+    
+    Tickets whose fingerprint matches the cached one only get their metadata
+    refreshed (e.g. a new status), without an LLM call.
     
     Args:
         ticket: Jira ticket dictionary
         item: Project item configuration
-        cached_keys: Set of already cached ticket keys
+        cached_fingerprints: Cached ticket keys mapped to their fingerprints
+        context_writer: Optional batch writer for analyzed contexts
+        metadata_writer: Optional batch writer for metadata refreshes
         
     Returns:
-        True if ticket was processed, False if skipped
+        Result and error: 'processed' if the ticket was analyzed, 'skipped'
+        if the cached context is still current, 'failed' otherwise, with
+        the error text of a failure or None
     """
     ticket_key = ticket['key']
     logger.debug(f"Found jira issue {ticket_key}")
     
-    if ticket_key in cached_keys:
-        logger.debug(f"Skipping {ticket_key} - already cached")
-        return False
+    # Fingerprint the untrimmed content so trimming rules never invalidate the cache
+    fingerprint = compute_fingerprint(ticket, item['title'])
+    
+    if ticket_key in cached_fingerprints:
+        cached_fingerprint = cached_fingerprints[ticket_key]
+        # Rows cached before fingerprinting adopt the current fingerprint
+        if cached_fingerprint is None or cached_fingerprint == fingerprint:
+            logger.debug(f"Skipping {ticket_key} - already cached")
+            try:
+                trim_ticket_description(ticket)
+                metadata = extract_ticket_metadata(ticket)
+                refresh_metadata(
+                    ticket_key,
+                    item['confluence'],
+                    json.dumps(metadata),
+                    fingerprint,
+                    writer=metadata_writer
+                )
+            except Exception as e:
+                logger.error(f"Failed to refresh metadata for {ticket_key}: {e}")
+                return 'failed', f"Failed to refresh metadata: {e}"
+            return 'skipped', None
+        logger.info(f"Content of {ticket_key} changed since last analysis")
     
     logger.info(f"Processing jira issue {ticket_key}")
+    # Imported here, strands is only loaded once a ticket needs the agent
+    from strands.types.exceptions import StructuredOutputException, MaxTokensReachedException
     
     try:
         # Trim description to fit context window
@@ -239,100 +586,650 @@ def process_ticket(
             ticket_key,
             item['confluence'],
             context.model_dump_json(indent=2),
-            json.dumps(metadata)
+            json.dumps(metadata),
+            fingerprint,
+            writer=context_writer
         )
+        cached_fingerprints[ticket_key] = fingerprint
         
         logger.info(f"Successfully processed {ticket_key}")
-        return True
+        return 'processed', None
         
     except StructuredOutputException as e:
         logger.error(f"Structured output failed for {ticket_key}: {e}")
-        return False
+        return 'failed', f"Structured output failed: {e}"
     except MaxTokensReachedException as e:
         logger.error(f"Max tokens reached for {ticket_key}: {e}")
-        return False
+        return 'failed', f"Max tokens reached: {e}"
     except Exception as e:
         logger.error(f"Unexpected error processing {ticket_key}: {e}")
-        return False
+        return 'failed', f"Unexpected error: {e}"
+
+def _collect_results(
+    done: Set[Future],
+    pending: Dict[Future, Dict[str, Any]]
+) -> Iterator[Tuple[Dict[str, Any], str, Optional[str]]]:
+    """Pop finished futures from pending and yield their tickets with results and errors."""
+    for future in done:
+        ticket = pending.pop(future)
+        try:
+            result, error = future.result()
+        except Exception as e:
+            logger.error(f"Worker failed processing {ticket['key']}: {e}")
+            result, error = 'failed', f"Worker failed: {e}"
+        yield ticket, result, error
 
-def process_project_item(item: Dict[str, Any]) -> Dict[str, int]:
+
+def analyze_tickets(
+    item: Dict[str, Any],
+    tickets: Iterable[Dict[str, Any]],
+    workers: int = ANALYSIS_WORKERS,
+    batch_size: int = JIRA_PAGE_SIZE,
+    deduplicate: bool = True
+) -> Iterator[Tuple[Dict[str, Any], str, Optional[str]]]:
+    """
+    Analyze a stream of tickets for a project on a pool of worker threads.
+    
+    Tickets are deduplicated, looked up in the cache batch by batch and
+    handed to process_ticket. At most twice as many tickets as workers are
+    in flight, so a slow LLM holds back the Jira stream instead of
+    buffering it. The next batch is only pulled from tickets once the
+    current one has been submitted.
+    
+    Cache writes are buffered, so a processed or skipped ticket is only
+    yielded once its row has been written. Rows that cannot be written when
+    the writers are closed are logged and their tickets yielded as failed.
+    
+    Args:
+        item: Project item configuration
+        tickets: Iterable of Jira ticket dictionaries
+        workers: Number of tickets analyzed concurrently
+        batch_size: Number of tickets pulled and looked up in the cache at once
+        deduplicate: If False, a key seen before is analyzed again, e.g. a
+            queued ticket claimed again after a failed attempt
+        
+    Yields:
+        (ticket, result, error) tuples in completion order, where result is
+        'processed', 'skipped' or 'failed' and error the text of a failure
+    """
+    seen_keys = set()
+    pending = {}
+    max_pending = max(1, workers) * 2
+    
+    # Keys whose cache rows were written, reported by the writers' flushes
+    written_keys = set()
+    written_lock = threading.Lock()
+    # Ticket key -> (ticket, result, error) waiting for its cache row to be written
+    unwritten = {}
+    
+    def on_flush(rows: List[tuple]) -> None:
+        with written_lock:
+            written_keys.update(row[0] for row in rows)
+    
+    def settle(
+        results: Iterable[Tuple[Dict[str, Any], str, Optional[str]]]
+    ) -> Iterator[Tuple[Dict[str, Any], str, Optional[str]]]:
+        """Yield failed results and results whose rows were written, hold back the rest."""
+        for ticket, result, error in results:
+            if result == 'failed':
+                yield ticket, result, error
+            else:
+                unwritten[ticket['key']] = (ticket, result, error)
+        with written_lock:
+            ready = [key for key in unwritten if key in written_keys]
+            # A key analyzed again later must wait for its new row
+            written_keys.difference_update(ready)
+        for key in ready:
+            yield unwritten.pop(key)
+    
+    context_writer = create_context_writer(on_flush=on_flush)
+    metadata_writer = create_metadata_writer(on_flush=on_flush)
+    
+    def close_writers() -> None:
+        for writer in (context_writer, metadata_writer):
+            try:
+                writer.close()
+            except Exception as e:
+                logger.error(f"Failed to write cached ticket data of project {item['title']}: {e}")
+    
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="analysis") as executor:
+            for batch in iter_batches(tickets, batch_size):
+                # Tickets matched by both JQLs are handled once
+                unique_batch = []
+                for ticket in batch:
+                    if not deduplicate or ticket['key'] not in seen_keys:
+                        seen_keys.add(ticket['key'])
+                        unique_batch.append(ticket)
+                
+                # Look up only this batch's keys within the project's cache
+                cached_fingerprints = get_cached_fingerprints(
+                    item['confluence'],
+                    [ticket['key'] for ticket in unique_batch]
+                )
+                
+                for ticket in unique_batch:
+                    # Back-pressure: wait for a free slot before submitting more work
+                    while len(pending) >= max_pending:
+                        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                        yield from settle(_collect_results(done, pending))
+                    future = executor.submit(
+                        process_ticket,
+                        ticket,
+                        item,
+                        cached_fingerprints,
+                        context_writer=context_writer,
+                        metadata_writer=metadata_writer
+                    )
+                    pending[future] = ticket
+            
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                yield from settle(_collect_results(done, pending))
+    except BaseException:
+        # Still write what was analyzed before the error
+        close_writers()
+        raise
+    
+    # Writers are closed, and thus flushed, after the worker pool has drained
+    close_writers()
+    yield from settle([])
+    for ticket, _, _ in unwritten.values():
+        logger.error(f"Cached data of {ticket['key']} was not written")
+        yield ticket, 'failed', "Cached data was not written"
+
+
+def search_tickets(item: Dict[str, Any], mark: Optional[datetime]) -> Iterator[Dict[str, Any]]:
+    """
+    Stream the tickets of a project's sprint and summary JQL.
+    
+    Tickets are fetched page by page so analysis starts before the last
+    page arrives. Tickets matched by both queries are yielded twice.
+    
+    Args:
+        item: Project item configuration
+        mark: Sync mark limiting the search to recently updated tickets, or None
+        
+    Returns:
+        Iterator over Jira ticket dictionaries
+    """
+    jira_api = api_manager.get_jira_api()
+    sprint_jql = apply_updated_since(item['sprint_jql'], mark)
+    summary_jql = apply_updated_since(item['jql'], mark)
+    
+    logger.info(f"Searching tickets with JQL: {sprint_jql}")
+    logger.info(f"Searching tickets with JQL: {summary_jql}")
+    return chain(
+        jira_api.iter_issues(jql=sprint_jql, page_size=JIRA_PAGE_SIZE),
+        jira_api.iter_issues(jql=summary_jql, page_size=JIRA_PAGE_SIZE)
+    )
+
+
+def process_project_item(
+    item: Dict[str, Any],
+    full_sync: bool = False,
+    workers: int = ANALYSIS_WORKERS
+) -> Dict[str, int]:
     """
     Process all tickets for a project item.
     
+    Only tickets updated since the project's sync mark are fetched, unless
+    full_sync is requested or no mark exists yet.
+    
     Args:
         item: Project item configuration
+        full_sync: If True, ignore the sync mark and fetch every ticket
+        workers: Number of tickets analyzed concurrently
         
     Returns:
         Dictionary with processing statistics
     """
     logger.info(f"Processing project: {item['title']}")
     
-    # Get Jira API client
-    jira_api = api_manager.get_jira_api()
+    # Limit the search to tickets changed since the last run
+    mark = None if full_sync else get_sync_mark(item)
+    tickets = search_tickets(item, mark)
     
-    # Search for tickets
-    logger.info(f"Searching tickets with JQL: {item['sprint_jql']}")
-    sprint_tickets = jira_api.search_issues(jql=item['sprint_jql'])
-    logger.info(f"Searching tickets with JQL: {item['jql']}")
-    summary_tickets = jira_api.search_issues(jql=item['jql'])
+    # Process each ticket
+    total = 0
+    counts = {'processed': 0, 'skipped': 0, 'failed': 0}
+    latest_updated = mark
+    earliest_failed = None
     
-    tickets = sprint_tickets + summary_tickets
-    logger.info(f"Found {len(tickets)} total tickets for project {item['title']}")
+    for ticket, result, _ in analyze_tickets(item, tickets, workers=workers):
+        total += 1
+        counts[result] += 1
+        updated = get_ticket_updated(ticket)
+        if updated is None:
+            continue
+        if latest_updated is None or updated > latest_updated:
+            latest_updated = updated
+        if result == 'failed' and (earliest_failed is None or updated < earliest_failed):
+            earliest_failed = updated
     
-    # Get cached keys
-    cached_keys = get_cached_keys()
+    logger.info(f"Found {total} total tickets for project {item['title']}")
     
-    # Process each ticket
-    processed = 0
-    skipped = 0
-    failed = 0
-    
-    for ticket in tickets:
-        result = process_ticket(ticket, item, cached_keys)
-        if result:
-            processed += 1
-        elif ticket['key'] in cached_keys:
-            skipped += 1
-        else:
-            failed += 1
+    # Never move the mark past a failed ticket so the next run retries it
+    new_mark = earliest_failed if earliest_failed is not None else latest_updated
+    if new_mark is not None and new_mark != mark:
+        store_sync_mark(item, new_mark)
     
     stats = {
-        'total': len(tickets),
-        'processed': processed,
-        'skipped': skipped,
-        'failed': failed
+        'total': total,
+        'processed': counts['processed'],
+        'skipped': counts['skipped'],
+        'failed': counts['failed']
     }
     
     logger.info(f"Project {item['title']} complete: {stats}")
     return stats
 
 
-if __name__ == "__main__":
+def enqueue_tickets(item: Dict[str, Any], tickets: Iterable[Dict[str, Any]]) -> Tuple[int, Optional[datetime]]:
+    """
+    Add tickets to a project's ingest queue.
+    
+    Tickets already queued with identical content keep their state, so
+    finished tickets are not analyzed again; changed tickets are reset to
+    pending.
+    
+    Args:
+        item: Project item configuration
+        tickets: Iterable of Jira ticket dictionaries
+        
+    Returns:
+        Number of tickets seen and the latest 'updated' timestamp among them
+    """
+    seen_keys = set()
+    latest_updated = None
+    for batch in iter_batches(tickets, JIRA_PAGE_SIZE):
+        rows = []
+        for ticket in batch:
+            # One statement must not upsert the same row twice
+            if ticket['key'] in seen_keys:
+                continue
+            seen_keys.add(ticket['key'])
+            rows.append((item['id'], ticket['key'], json.dumps(ticket)))
+            updated = get_ticket_updated(ticket)
+            if updated is not None and (latest_updated is None or updated > latest_updated):
+                latest_updated = updated
+        if rows:
+            db_manager.execute_values(QUEUE_ENQUEUE_QUERY, rows, template="(%s, %s, %s::jsonb)")
+    
+    logger.info(f"Queued {len(seen_keys)} tickets for project {item['title']}")
+    return len(seen_keys), latest_updated
+
+
+def claim_tickets(
+    item: Dict[str, Any],
+    limit: int,
+    exclude: Iterable[int] = ()
+) -> List[Tuple[int, Dict[str, Any]]]:
+    """
+    Lease pending tickets of a project to this worker.
+    
+    Rows locked by concurrent claims are skipped, so workers on several
+    nodes never claim the same ticket. Tickets whose lease expired, e.g.
+    because their worker crashed, are claimed again, as are tickets left
+    in flight by an earlier run with the same QUEUE_WORKER_ID.
+    
+    Args:
+        item: Project item configuration
+        limit: Maximum number of tickets to claim
+        exclude: Queue ids this worker is still processing
+        
+    Returns:
+        List of (queue id, ticket) tuples in queue order
+    """
+    rows = db_manager.execute_query(
+        QUEUE_CLAIM_QUERY,
+        (
+            QUEUE_WORKER_ID,
+            QUEUE_LEASE_SECONDS,
+            item['id'],
+            QUEUE_MAX_ATTEMPTS,
+            QUEUE_WORKER_ID,
+            list(exclude),
+            limit
+        )
+    )
+    return sorted(rows, key=lambda row: row[0])
+
+
+def extend_leases(ids: List[int]) -> None:
+    """Extend the leases of tickets this worker is still processing."""
+    query = """
+        UPDATE devops.crew_pm_ingest_queue 
+        SET lease_until=now() + %s * interval '1 second', updated_at=now() 
+        WHERE id = ANY(%s) AND state='in_flight' AND worker=%s
+    """
+    db_manager.execute_query(query, (QUEUE_LEASE_SECONDS, ids, QUEUE_WORKER_ID), fetch=False)
+
+
+@contextmanager
+def lease_heartbeat(get_ids: Callable[[], List[int]]) -> Iterator[None]:
+    """
+    Keep extending the leases of claimed tickets for the duration of a with-block.
+    
+    Args:
+        get_ids: Returns the queue ids of the tickets currently claimed,
+            called from the heartbeat thread at every beat
+    """
+    stopped = threading.Event()
+    
+    def beat() -> None:
+        while not stopped.wait(QUEUE_HEARTBEAT_SECONDS):
+            try:
+                ids = get_ids()
+                if ids:
+                    extend_leases(ids)
+            except Exception as e:
+                # The next beat retries well before the lease runs out
+                logger.warning(f"Failed to extend ticket leases: {e}")
+    
+    heartbeat = threading.Thread(target=beat, name="queue-heartbeat", daemon=True)
+    heartbeat.start()
+    try:
+        yield
+    finally:
+        stopped.set()
+        heartbeat.join()
+
+
+def complete_tickets(ids: List[int]) -> None:
+    """Mark claimed tickets as done, unless their lease was taken over meanwhile."""
+    if not ids:
+        return
+    query = """
+        UPDATE devops.crew_pm_ingest_queue 
+        SET state='done', worker=NULL, lease_until=NULL, last_error=NULL, updated_at=now() 
+        WHERE id = ANY(%s) AND state='in_flight' AND worker=%s
+    """
+    db_manager.execute_query(query, (ids, QUEUE_WORKER_ID), fetch=False)
+
+
+def fail_tickets(failures: List[Tuple[int, str]]) -> None:
+    """
+    Return claimed tickets to the queue after a failure.
+    
+    Tickets that used up QUEUE_MAX_ATTEMPTS are marked failed instead.
+    
+    Args:
+        failures: (queue id, error) tuples, the error is recorded as the
+            ticket's last_error
+    """
+    if not failures:
+        return
+    db_manager.execute_values(
+        QUEUE_FAIL_QUERY,
+        [(queue_id, error, QUEUE_MAX_ATTEMPTS, QUEUE_WORKER_ID) for queue_id, error in failures]
+    )
+
+
+def expire_tickets(item: Dict[str, Any]) -> None:
+    """Mark tickets failed whose last allowed attempt lost its lease."""
+    query = """
+        UPDATE devops.crew_pm_ingest_queue 
+        SET state='failed', worker=NULL, lease_until=NULL, last_error='Lease expired', updated_at=now() 
+        WHERE project_id=%s AND state='in_flight' AND lease_until < now() AND attempts >= %s
+    """
+    db_manager.execute_query(query, (item['id'], QUEUE_MAX_ATTEMPTS), fetch=False)
+
+
+def retry_failed_tickets(item: Dict[str, Any]) -> None:
+    """Return a project's failed tickets to the queue with a fresh attempt budget."""
+    query = """
+        UPDATE devops.crew_pm_ingest_queue 
+        SET state='pending', attempts=0, last_error=NULL, updated_at=now() 
+        WHERE project_id=%s AND state='failed'
+    """
+    db_manager.execute_query(query, (item['id'],), fetch=False)
+
+
+def drain_queue(item: Dict[str, Any], workers: int = ANALYSIS_WORKERS) -> Dict[str, int]:
+    """
+    Analyze queued tickets of a project until its queue is empty.
+    
+    One analyze_tickets pipeline serves the whole drain. Whenever it has
+    room for more work, finished tickets are acknowledged and one ticket
+    per worker is claimed, so no worker waits for the slowest ticket of a
+    batch. A single heartbeat extends the leases of all claimed tickets
+    until they are acknowledged. Tickets are marked done only after their
+    context has been written, so an interrupted run resumes with the
+    tickets that were not finished.
+    
+    Args:
+        item: Project item configuration
+        workers: Number of tickets analyzed concurrently
+        
+    Returns:
+        Dictionary with processing statistics
+    """
+    expire_tickets(item)
+    total = 0
+    counts = {'processed': 0, 'skipped': 0, 'failed': 0}
+    # Ticket key -> queue id of claimed tickets not acknowledged yet, read by the heartbeat
+    claimed_ids = {}
+    claimed_lock = threading.Lock()
+    # Keys of finished tickets, and ticket key -> error of failed ones, waiting to be acknowledged
+    done, failed = [], {}
+    
+    def get_claimed_ids() -> List[int]:
+        with claimed_lock:
+            return list(claimed_ids.values())
+    
+    def acknowledge() -> None:
+        complete_tickets([claimed_ids[key] for key in done])
+        fail_tickets([(claimed_ids[key], error) for key, error in failed.items()])
+        with claimed_lock:
+            for key in [*done, *failed]:
+                del claimed_ids[key]
+        done.clear()
+        failed.clear()
+    
+    def claim() -> Iterator[Dict[str, Any]]:
+        """Claim tickets whenever the pipeline asks for more, until the queue is empty."""
+        nonlocal total
+        while True:
+            acknowledge()
+            claimed = claim_tickets(item, max(1, workers), exclude=get_claimed_ids())
+            if not claimed:
+                return
+            with claimed_lock:
+                claimed_ids.update((ticket['key'], queue_id) for queue_id, ticket in claimed)
+            total += len(claimed)
+            for _, ticket in claimed:
+                yield ticket
+    
+    with lease_heartbeat(get_claimed_ids):
+        try:
+            # A failed ticket may be claimed again, so keys are not deduplicated
+            for ticket, result, error in analyze_tickets(
+                item,
+                claim(),
+                workers=workers,
+                batch_size=max(1, workers),
+                deduplicate=False
+            ):
+                # Yielded once the ticket's cache row is written
+                counts[result] += 1
+                if result == 'failed':
+                    failed[ticket['key']] = error
+                else:
+                    done.append(ticket['key'])
+            acknowledge()
+        except Exception as e:
+            logger.error(f"Failed to process queued tickets of project {item['title']}: {e}")
+            complete_tickets([claimed_ids[key] for key in done])
+            fail_tickets([
+                (queue_id, failed.get(key) or str(e))
+                for key, queue_id in claimed_ids.items() if key not in done
+            ])
+            raise
+    
+    return {'total': total, **counts}
+
+
+def process_project_queue(
+    item: Dict[str, Any],
+    full_sync: bool = False,
+    workers: int = ANALYSIS_WORKERS,
+    enqueue: bool = True,
+    retry_failed: bool = False
+) -> Dict[str, int]:
+    """
+    Process a project item through its durable ingest queue.
+    
+    Tickets updated since the sync mark are queued first and the mark is
+    stored as soon as they are queued, so a crash during analysis never
+    causes them to be fetched again. The queue is then drained, possibly
+    together with workers on other nodes.
+    
+    Args:
+        item: Project item configuration
+        full_sync: If True, ignore the sync mark and queue every ticket
+        workers: Number of tickets analyzed concurrently
+        enqueue: If False, only drain tickets queued earlier
+        retry_failed: If True, give failed tickets another attempt budget
+        
+    Returns:
+        Dictionary with processing statistics
+    """
+    logger.info(f"Processing project queue: {item['title']}")
+    enqueued = 0
+    
+    if enqueue:
+        mark = None if full_sync else get_sync_mark(item)
+        enqueued, latest_updated = enqueue_tickets(item, search_tickets(item, mark))
+        # The overlap window may return tickets older than the mark, never move it back
+        if latest_updated is not None and (mark is None or latest_updated > mark):
+            store_sync_mark(item, latest_updated)
+    if retry_failed:
+        retry_failed_tickets(item)
+    
+    stats = {'enqueued': enqueued, **drain_queue(item, workers=workers)}
+    logger.info(f"Project {item['title']} complete: {stats}")
+    return stats
+
+
+def run(
+    full_sync: bool = False,
+    workers: int = ANALYSIS_WORKERS,
+    project_concurrency: int = PROJECT_CONCURRENCY,
+    queue: bool = False,
+    enqueue: bool = True,
+    retry_failed: bool = False
+) -> Dict[str, int]:
+    """
+    Run the ingestion flow for all project items.
+    
+    Args:
+        full_sync: If True, ignore stored sync marks and fetch every ticket
+        workers: Number of tickets analyzed concurrently per project
+        project_concurrency: Number of projects processed concurrently
+        queue: If True, process tickets through the durable ingest queue
+        enqueue: In queue mode, if False only drain tickets queued earlier
+        retry_failed: In queue mode, give failed tickets another attempt budget
+        
+    Returns:
+        Overall statistics
+    """
     logger.info("Starting scrum agent flow")
     items = load_items()
-    overall_stats = {
-        'projects': 0,
-        'total_tickets': 0,
-        'total_processed': 0,
-        'total_skipped': 0,
-        'total_failed': 0
-    }
     if not items:
         logger.warning("No project items found")
     
-    # Process each project item
-    all_stats = []
-    for item in items:
-        stats = process_project_item(item)
-        all_stats.append(stats)
+    def process(item: Dict[str, Any]) -> Optional[Dict[str, int]]:
+        try:
+            if queue:
+                return process_project_queue(
+                    item,
+                    full_sync=full_sync,
+                    workers=workers,
+                    enqueue=enqueue,
+                    retry_failed=retry_failed
+                )
+            return process_project_item(item, full_sync=full_sync, workers=workers)
+        except Exception as e:
+            # Other projects are still processed
+            logger.error(f"Failed to process project {item['title']}: {e}")
+            return None
+    
+    # Process project items, LLM calls are additionally capped by --llm-concurrency if set
+    with ThreadPoolExecutor(max_workers=max(1, project_concurrency), thread_name_prefix="ingest-project") as executor:
+        results = list(executor.map(process, items))
+    all_stats = [stats for stats in results if stats is not None]
     
     # Calculate overall statistics
     overall_stats = {
         'projects': len(items),
+        'failed_projects': len(items) - len(all_stats),
         'total_tickets': sum(s['total'] for s in all_stats),
         'total_processed': sum(s['processed'] for s in all_stats),
         'total_skipped': sum(s['skipped'] for s in all_stats),
         'total_failed': sum(s['failed'] for s in all_stats)
     }
+    if queue:
+        overall_stats['total_enqueued'] = sum(s['enqueued'] for s in all_stats)
     
     logger.info(f"Scrum agent flow complete: {overall_stats}")
+    if get_llm_cache() is not None:
+        logger.info(f"LLM cache statistics: {get_llm_cache().stats()}")
+    logger.info(f"HTTP transport statistics: {api_manager.transport_stats()}")
+    return overall_stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Analyze Jira tickets and cache their context.")
+    parser.add_argument(
+        "--full-sync",
+        action="store_true",
+        help="ignore stored sync marks and fetch every ticket"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=ANALYSIS_WORKERS,
+        help=f"number of tickets analyzed concurrently (default: {ANALYSIS_WORKERS})"
+    )
+    parser.add_argument(
+        "--projects",
+        type=int,
+        default=PROJECT_CONCURRENCY,
+        help=f"number of projects processed concurrently (default: {PROJECT_CONCURRENCY})"
+    )
+    parser.add_argument(
+        "--queue",
+        action="store_true",
+        help="process tickets through the durable ingest queue, resuming interrupted runs"
+    )
+    parser.add_argument(
+        "--drain-only",
+        action="store_true",
+        help="with --queue, only process tickets queued earlier (e.g. on additional worker nodes)"
+    )
+    parser.add_argument(
+        "--retry-failed",
+        action="store_true",
+        help="with --queue, retry tickets that exhausted their attempts"
+    )
+    parser.add_argument(
+        "--llm-concurrency",
+        type=int,
+        default=LLM_MAX_CONCURRENCY,
+        help="maximum in-flight LLM calls of the process, 0 leaves it to the worker settings "
+             f"(default: {LLM_MAX_CONCURRENCY})"
+    )
+    args = parser.parse_args()
+    if (args.drain_only or args.retry_failed) and not args.queue:
+        parser.error("--drain-only and --retry-failed require --queue")
+    set_llm_concurrency(args.llm_concurrency)
+    
+    run(
+        full_sync=args.full_sync,
+        workers=args.workers,
+        project_concurrency=args.projects,
+        queue=args.queue,
+        enqueue=not args.drain_only,
+        retry_failed=args.retry_failed
+    )
@@ -0,0 +1,6 @@
+-- Per-project high-water mark for incremental ticket ingestion
+CREATE TABLE IF NOT EXISTS devops.crew_pm_sync (
+  project_id INTEGER PRIMARY KEY REFERENCES devops.crew_pm_exec(id) ON DELETE CASCADE,
+  jql_hash VARCHAR(64),
+  last_updated TIMESTAMPTZ
+);
@@ -0,0 +1,2 @@
+-- Fingerprint of the ticket content the cached context was generated from
+ALTER TABLE devops.crew_pm_cache ADD COLUMN IF NOT EXISTS fingerprint VARCHAR(64);
@@ -0,0 +1,4 @@
+-- Supports cache lookups scoped to one project and a batch of keys
+-- (WHERE confluence_id = ... AND key = ANY(...)) as index-only scans
+CREATE INDEX CONCURRENTLY IF NOT EXISTS crew_pm_cache_confluence_key_idx
+  ON devops.crew_pm_cache (confluence_id, key) INCLUDE (fingerprint);
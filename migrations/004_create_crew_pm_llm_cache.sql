@@ -0,0 +1,10 @@
+-- Shared LLM response cache, used when LLM_CACHE_BACKEND = "postgres"
+CREATE TABLE IF NOT EXISTS devops.crew_pm_llm_cache (
+  key VARCHAR(64) PRIMARY KEY,
+  response TEXT NOT NULL,
+  created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+  accessed_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS crew_pm_llm_cache_accessed_idx
+  ON devops.crew_pm_llm_cache (accessed_at);
@@ -0,0 +1,9 @@
+-- Memoized timeline month summaries per executive summary page
+CREATE TABLE IF NOT EXISTS devops.crew_pm_timeline (
+  confluence_id INTEGER NOT NULL,
+  month_start DATE NOT NULL,
+  digest VARCHAR(64) NOT NULL,
+  description TEXT,
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+  PRIMARY KEY (confluence_id, month_start)
+);
@@ -0,0 +1,5 @@
+-- Supports recent-ticket loads of the executive summary
+-- (WHERE confluence_id = ... AND left(metadata->>'created', 10) > ... AND metadata->>'status' ...)
+-- as a range scan on the creation date with the status checked in the index
+CREATE INDEX CONCURRENTLY IF NOT EXISTS crew_pm_cache_confluence_created_status_idx
+  ON devops.crew_pm_cache (confluence_id, (left(metadata->>'created', 10)), (metadata->>'status'));
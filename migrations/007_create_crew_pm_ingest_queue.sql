@@ -0,0 +1,22 @@
+-- Durable per-project ticket queue for resumable ingestion
+-- (claimed with FOR UPDATE SKIP LOCKED, in_flight rows are leased to one worker)
+CREATE TABLE IF NOT EXISTS devops.crew_pm_ingest_queue (
+  id BIGSERIAL PRIMARY KEY,
+  project_id INTEGER NOT NULL REFERENCES devops.crew_pm_exec(id) ON DELETE CASCADE,
+  key VARCHAR(25) NOT NULL,
+  ticket JSONB NOT NULL,
+  state VARCHAR(16) NOT NULL DEFAULT 'pending'
+    CHECK (state IN ('pending', 'in_flight', 'done', 'failed')),
+  attempts INTEGER NOT NULL DEFAULT 0,
+  worker VARCHAR(255),
+  lease_until TIMESTAMPTZ,
+  last_error TEXT,
+  enqueued_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+  UNIQUE (project_id, key)
+);
+
+-- Claims scan only open rows of a project in queue order
+CREATE INDEX IF NOT EXISTS crew_pm_ingest_queue_open_idx
+  ON devops.crew_pm_ingest_queue (project_id, id)
+  WHERE state IN ('pending', 'in_flight');
@@ -1,60 +1,21 @@
-import os
 import logging
-import hvac
 import psycopg2
 import json
-from dotenv import load_dotenv
-from connectors.confluenceapi import ConfluenceApi
-from connectors.jirapi import JiraApi
+from common_utils import get_api_manager, get_config_manager
 from model.jira_context import JiraContext
-from jinja2 import Environment, FileSystemLoader
-from strands import Agent
-from strands.models.ollama import OllamaModel
-from strands.types.exceptions import StructuredOutputException, MaxTokensReachedException
-from tools.strands_limit_hook import LimitToolCounts
 
 log = logging.getLogger(__name__)
 log.setLevel(logging.DEBUG)
 log.addHandler(logging.StreamHandler())
-load_dotenv()
 
-client = hvac.Client(url=os.getenv("VAULT_URL"))
-client.auth.approle.login(
-    role_id=os.getenv("VAULT_ROLE_ID"),
-    secret_id=os.getenv("VAULT_SECRET_ID"),
-)
-
-db_secret = client.secrets.kv.read_secret_version(path="secret/cmdb")
-
-DB_NAME = db_secret["data"]["data"]["psql_db"]
-DB_USER = db_secret["data"]["data"]["psql_user"]
-DB_PASSWORD = db_secret["data"]["data"]["psql_pw"]
-DB_HOST = db_secret["data"]["data"]["psql_host"]
-DB_PORT = db_secret["data"]["data"]["psql_port"]
-
-llm_secret = client.secrets.kv.read_secret_version(path="secret/llm")
-
-jira_secret = client.secrets.kv.read_secret_version(path="secret/jira")
-confluence_secret = client.secrets.kv.read_secret_version(path="secret/confluence")
-
-jira_api = JiraApi(
-    hostname=jira_secret["data"]["data"]["url"],
-    auth_token=jira_secret["data"]["data"]["token"],
-)
-confluence_api = ConfluenceApi(
-    hostname=confluence_secret["data"]["data"]["url"],
-    auth_token=confluence_secret["data"]["data"]["token"],
-)
-
-jinja_env = Environment(loader=FileSystemLoader("templates"))
-exec_template = jinja_env.get_template("exec_summary.html.j2")
+# Vault and the API clients are initialized on first use, not at import
+config_manager = get_config_manager()
+api_manager = get_api_manager()
 
 
 def load_items():
     items = []
-    with psycopg2.connect(
-        dbname=DB_NAME, user=DB_USER, password=DB_PASSWORD, host=DB_HOST, port=DB_PORT
-    ) as db_connection:
+    with psycopg2.connect(**config_manager.get_db_config()) as db_connection:
         db_connection.set_session(autocommit=True)
         with db_connection.cursor() as cursor:
           log.info("Successfully connected to PostgreSQL database.")
@@ -65,13 +26,7 @@ def load_items():
     return items
 
 def store_context(key,confluence_id, content, metadata):
-   with psycopg2.connect(
-      dbname=DB_NAME,
-      user=DB_USER,
-      password=DB_PASSWORD,
-      host=DB_HOST,
-      port=DB_PORT,
-   ) as db_connection:
+   with psycopg2.connect(**config_manager.get_db_config()) as db_connection:
       db_connection.set_session(autocommit=True)
       with db_connection.cursor() as cursor:
          sql_query = "INSERT INTO devops.crew_pm_cache (key, confluence_id, context,metadata) VALUES (%s,%s,%s,%s) ON CONFLICT (key,confluence_id) DO UPDATE SET context=%s, metadata=%s"
@@ -89,13 +44,7 @@ def store_context(key,confluence_id, content, metadata):
 
 def get_cached_keys():
    keys = []
-   with psycopg2.connect(
-      dbname=DB_NAME,
-      user=DB_USER,
-      password=DB_PASSWORD,
-      host=DB_HOST,
-      port=DB_PORT,
-   ) as db_connection:
+   with psycopg2.connect(**config_manager.get_db_config()) as db_connection:
       db_connection.set_session(autocommit=True)
       with db_connection.cursor() as cursor:
         sql_query = "Select key from devops.crew_pm_cache"
@@ -105,6 +54,12 @@ def get_cached_keys():
         return keys
 
 if __name__ == "__main__":
+    from strands import Agent
+    from strands.models.ollama import OllamaModel
+    from strands.types.exceptions import StructuredOutputException, MaxTokensReachedException
+    from tools.strands_limit_hook import LimitToolCounts
+
+    jira_api = api_manager.get_jira_api()
     for item in load_items():
         tickets = jira_api.search_issues(jql=item["jql"])
         keys = get_cached_keys ()
@@ -0,0 +1,58 @@
+"""
+Replay Webhooks - Posts recorded Jira webhook payloads to the webhook receiver.
+Stands in for Jira when testing webhook_receiver.py locally.
+"""
+import argparse
+import json
+import time
+from typing import Any, Dict, List
+
+import requests
+
+from common_utils import setup_logging
+
+# Constants
+DEFAULT_URL = 'http://localhost:8080/webhook'
+
+# Setup logging
+logger = setup_logging(__name__)
+
+
+def load_payloads(paths: List[str]) -> List[Dict[str, Any]]:
+    """
+    Load webhook payloads from JSON files.
+    
+    Args:
+        paths: Files containing a single payload or a list of payloads
+        
+    Returns:
+        Payloads in file order
+    """
+    payloads = []
+    for path in paths:
+        with open(path) as f:
+            data = json.load(f)
+        payloads.extend(data if isinstance(data, list) else [data])
+    return payloads
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Post recorded Jira webhook payloads to the webhook receiver.")
+    parser.add_argument("files", nargs="+", help="JSON files with one payload or a list of payloads")
+    parser.add_argument(
+        "--url",
+        default=DEFAULT_URL,
+        help=f"receiver URL (default: {DEFAULT_URL})"
+    )
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds between two payloads (default: 0)")
+    parser.add_argument("--repeat", type=int, default=1, help="number of times the payloads are sent (default: 1)")
+    args = parser.parse_args()
+    
+    payloads = load_payloads(args.files)
+    with requests.Session() as session:
+        for _ in range(args.repeat):
+            for payload in payloads:
+                response = session.post(args.url, json=payload, timeout=10)
+                key = (payload.get('issue') or {}).get('key')
+                logger.info(f"{payload.get('webhookEvent')} {key}: {response.status_code} {response.text}")
+                time.sleep(args.delay)
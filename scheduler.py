@@ -0,0 +1,179 @@
+"""
+Scheduler - Long-running service that runs the ingestion, executive summary
+and ticket updater flows on fixed intervals in one process, so the Vault
+token, secret cache, database pool, HTTP sessions and pooled agents stay
+warm between runs.
+"""
+import argparse
+import os
+import signal
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import exec_summary_agent
+import ingest_tickets_with_scrum_agent
+import ticket_updater_scrum_agent
+from common_utils import get_db_manager, set_llm_concurrency, setup_logging, LLM_MAX_CONCURRENCY
+
+# Constants, intervals in seconds
+INGEST_INTERVAL = int(os.getenv('INGEST_INTERVAL', 3600))
+EXEC_SUMMARY_INTERVAL = int(os.getenv('EXEC_SUMMARY_INTERVAL', 86400))
+TICKET_UPDATER_INTERVAL = int(os.getenv('TICKET_UPDATER_INTERVAL', 86400))
+INGEST_PROJECT_CONCURRENCY = int(os.getenv('INGEST_PROJECT_CONCURRENCY', 2))
+EXEC_SUMMARY_PROJECT_CONCURRENCY = int(os.getenv('EXEC_SUMMARY_PROJECT_CONCURRENCY', 2))
+TICKET_UPDATER_CONCURRENCY = int(os.getenv('TICKET_UPDATER_CONCURRENCY', 2))
+
+# Setup logging
+logger = setup_logging(__name__)
+
+
+class Job:
+    """A flow run periodically; two runs of the same job never overlap."""
+
+    def __init__(self, name: str, func: Callable[..., Dict[str, Any]], interval: float, **kwargs):
+        """
+        Initialize job.
+
+        Args:
+            name: Job name used in logs and by --only
+            func: Flow entry point returning its statistics
+            interval: Seconds between the starts of two runs
+            kwargs: Arguments passed to func
+        """
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.kwargs = kwargs
+        self.next_run = time.monotonic()
+        self._running = threading.Lock()
+
+    def run(self) -> Optional[Dict[str, Any]]:
+        """
+        Run the flow unless a previous run is still in progress.
+
+        Returns:
+            Flow statistics, or None if the run was skipped or failed
+        """
+        if not self._running.acquire(blocking=False):
+            logger.warning(f"Job {self.name} is still running, skipping this run")
+            return None
+        try:
+            logger.info(f"Starting job {self.name}")
+            started = time.monotonic()
+            stats = self.func(**self.kwargs)
+            logger.info(f"Job {self.name} finished in {time.monotonic() - started:.1f}s: {stats}")
+            return stats
+        except Exception as e:
+            logger.error(f"Job {self.name} failed: {e}")
+            return None
+        finally:
+            self._running.release()
+
+    def schedule_next(self) -> None:
+        """Schedule the next run one interval after the last scheduled start, never in the past."""
+        self.next_run = max(self.next_run + self.interval, time.monotonic())
+
+
+class Scheduler:
+    """Runs each job in its own thread until stopped."""
+
+    def __init__(self, jobs: List[Job]):
+        """Initialize scheduler with its jobs."""
+        self.jobs = jobs
+        self._stop = threading.Event()
+        self._threads = []
+
+    def _run_job(self, job: Job) -> None:
+        """Run a job at its scheduled times until the scheduler is stopped."""
+        while not self._stop.wait(max(0.0, job.next_run - time.monotonic())):
+            job.run()
+            job.schedule_next()
+            logger.info(f"Next run of job {job.name} in {job.next_run - time.monotonic():.0f}s")
+
+    def start(self) -> None:
+        """Start one thread per job."""
+        for job in self.jobs:
+            logger.info(f"Scheduling job {job.name} every {job.interval}s")
+            thread = threading.Thread(target=self._run_job, args=(job,), name=f"job-{job.name}")
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, *_) -> None:
+        """Stop scheduling new runs; runs in progress are completed."""
+        if not self._stop.is_set():
+            logger.info("Stopping scheduler, waiting for running jobs to finish")
+            self._stop.set()
+
+    def wait(self) -> None:
+        """Block until all job threads have exited."""
+        # Join with a timeout so the main thread keeps handling signals
+        for thread in self._threads:
+            while thread.is_alive():
+                thread.join(1.0)
+
+
+def create_jobs() -> List[Job]:
+    """Create the scheduled flow jobs."""
+    return [
+        Job(
+            "ingest",
+            ingest_tickets_with_scrum_agent.run,
+            INGEST_INTERVAL,
+            project_concurrency=INGEST_PROJECT_CONCURRENCY
+        ),
+        Job(
+            "exec_summary",
+            exec_summary_agent.run,
+            EXEC_SUMMARY_INTERVAL,
+            project_concurrency=EXEC_SUMMARY_PROJECT_CONCURRENCY
+        ),
+        Job(
+            "ticket_updater",
+            ticket_updater_scrum_agent.run,
+            TICKET_UPDATER_INTERVAL,
+            concurrency=TICKET_UPDATER_CONCURRENCY
+        ),
+    ]
+
+
+if __name__ == "__main__":
+    jobs = create_jobs()
+    parser = argparse.ArgumentParser(description="Run all flows on fixed intervals.")
+    parser.add_argument(
+        "--once",
+        action="store_true",
+        help="run the selected jobs once, one after another, and exit"
+    )
+    parser.add_argument(
+        "--only",
+        nargs="+",
+        choices=[job.name for job in jobs],
+        help="run only the given jobs"
+    )
+    parser.add_argument(
+        "--llm-concurrency",
+        type=int,
+        default=LLM_MAX_CONCURRENCY,
+        help="maximum in-flight LLM calls of the process, 0 leaves it to the worker settings "
+             f"(default: {LLM_MAX_CONCURRENCY})"
+    )
+    args = parser.parse_args()
+    set_llm_concurrency(args.llm_concurrency)
+
+    if args.only:
+        jobs = [job for job in jobs if job.name in args.only]
+
+    try:
+        if args.once:
+            for job in jobs:
+                job.run()
+        else:
+            scheduler = Scheduler(jobs)
+            signal.signal(signal.SIGTERM, scheduler.stop)
+            signal.signal(signal.SIGINT, scheduler.stop)
+            scheduler.start()
+            scheduler.wait()
+    finally:
+        get_db_manager().close()
+        logger.info("Scheduler stopped")
@@ -4,27 +4,34 @@ using AI agent into predefined categories with optional Confluence architecture
 """
 import json
 import re
-import pandas as pd
-from typing import List, Dict, Any, Optional
-from tools.strands_limit_hook import LimitToolCounts
+from typing import TYPE_CHECKING, Iterable, List, Dict, Any, Optional
 from common_utils import (
-    ConfigManager,
-    APIClientManager,
-    AgentFactory,
+    get_config_manager,
+    get_api_manager,
+    call_agent,
+    get_llm_cache,
     setup_logging,
-    OLLAMA_MAX_TOKENS
+    truncate_tokens,
+    OLLAMA_MAX_TOKENS,
+    JIRA_PAGE_SIZE
 )
 
+# pandas is only needed to build the result table
+if TYPE_CHECKING:
+    import pandas as pd
+
 # Constants
-MAX_DESCRIPTION_LENGTH = 2048
+MAX_DESCRIPTION_TOKENS = 512
+MAX_ARCHITECTURE_CONTEXT_TOKENS = 256
 MAX_TOOL_COUNTS = {"sleep": 3}
 
 # Setup logging
 logger = setup_logging(__name__)
 
 # Initialize managers
-config_manager = ConfigManager()
-api_manager = APIClientManager(config_manager)
+# Initialized lazily: Vault is contacted on first use
+config_manager = get_config_manager()
+api_manager = get_api_manager()
 
 # Configuration
 jql = "assignee = pjesensky AND resolution = Unresolved"
@@ -116,20 +123,17 @@ def categorize_ticket_with_agent(
     ticket_key = ticket['key']
     logger.info(f"Categorizing ticket {ticket_key} with AI agent")
     
-    # Create LLM and agent
-    llm = AgentFactory.create_ollama_model(max_tokens=OLLAMA_MAX_TOKENS)
-    limit_hook = LimitToolCounts(max_tool_counts=MAX_TOOL_COUNTS)
-    agent = AgentFactory.create_scrum_agent(model=llm, hooks=[limit_hook])
-    
     # Extract ticket fields
     fields = ticket.get('fields', {})
     summary = fields.get('summary', 'No summary')
     description = fields.get('description', 'No description')
     
     # Trim description if too long
-    if description and len(description) > MAX_DESCRIPTION_LENGTH:
-        description = description[:MAX_DESCRIPTION_LENGTH]
-        logger.debug(f"Trimmed description for {ticket_key} to {MAX_DESCRIPTION_LENGTH} characters")
+    if description:
+        trimmed = truncate_tokens(description, MAX_DESCRIPTION_TOKENS)
+        if trimmed != description:
+            description = trimmed
+            logger.debug(f"Trimmed description for {ticket_key} to {MAX_DESCRIPTION_TOKENS} tokens")
     
     issue_type = fields.get('issuetype', {}).get('name', 'Unknown')
     labels = ', '.join(fields.get('labels', []))
@@ -137,7 +141,7 @@ def categorize_ticket_with_agent(
     # Build context section
     context_section = ""
     if confluence_context:
-        context_section = f"\n\nAdditional Architecture Context:\n{confluence_context[:1000]}"
+        context_section = f"\n\nAdditional Architecture Context:\n{truncate_tokens(confluence_context, MAX_ARCHITECTURE_CONTEXT_TOKENS)}"
     
     # Prepare prompt
     prompt = f"""
@@ -167,12 +171,14 @@ def categorize_ticket_with_agent(
     """
     
     try:
-        # Execute agent
-        response = agent(
+        # Execute pooled agent, reusing cached responses for identical prompts
+        response_text = call_agent(
             prompt,
-            hooks=[limit_hook]
+            role='scrum',
+            max_tokens=OLLAMA_MAX_TOKENS,
+            max_tool_counts=MAX_TOOL_COUNTS
         )
-        json_response = parse_json_from_text( response.message ['content'] [0] ['text'])
+        json_response = parse_json_from_text(response_text)
         logger.info(f"Successfully categorized ticket {ticket_key}")
         
         # Build result dictionary
@@ -202,14 +208,17 @@ def categorize_ticket_with_agent(
         }
 
 def process_tickets(
-    tickets: List[Dict[str, Any]],
+    tickets: Iterable[Dict[str, Any]],
     category_configs: List[Dict[str, Any]]
-) -> pd.DataFrame:
+) -> 'pd.DataFrame':
     """
     Process all tickets against all category configurations.
     
+    Tickets are consumed as a stream, so categorization can start while
+    later search pages are still being fetched.
+    
     Args:
-        tickets: List of Jira ticket dictionaries
+        tickets: Iterable of Jira ticket dictionaries
         category_configs: List of category configuration dictionaries
         
     Returns:
@@ -217,34 +226,39 @@ def process_tickets(
     """
     results = []
     
+    # Load Confluence context once per category if architecture page is specified
+    confluence_contexts = {}
     for category_config in category_configs:
-        logger.info(f"Processing category: {category_config['name']}")
-        
-        # Load Confluence context if architecture page is specified
         confluence_context = None
         if 'architecture' in category_config:
             confluence_context = load_confluence_context(category_config['architecture'])
-        
-        # Process each ticket for this category
-        for ticket in tickets:
+        confluence_contexts[category_config['name']] = confluence_context
+    
+    # Process each ticket against every category
+    ticket_count = 0
+    for ticket in tickets:
+        ticket_count += 1
+        for category_config in category_configs:
+            logger.debug(f"Processing category {category_config['name']} for {ticket['key']}")
             result = categorize_ticket_with_agent(
                 ticket,
                 category_config,
-                confluence_context
+                confluence_contexts[category_config['name']]
             )
             if result:
                 results.append(result)
     
     # Create DataFrame
+    import pandas as pd
     df = pd.DataFrame(results)
     
-    logger.info(f"Processed {len(tickets)} tickets against {len(category_configs)} categories")
+    logger.info(f"Processed {ticket_count} tickets against {len(category_configs)} categories")
     logger.info(f"Total categorization results: {len(results)}")
     
     return df
 
 
-def save_results_to_csv(df: pd.DataFrame, output_path: str = "ticket_categorization_results.csv") -> None:
+def save_results_to_csv(df: 'pd.DataFrame', output_path: str = "ticket_categorization_results.csv") -> None:
     """
     Save categorization results to CSV file.
     
@@ -262,8 +276,7 @@ if __name__ == "__main__":
     # Step 1: Load tickets via JQL
     jira_api = api_manager.get_jira_api()
     logger.info(f"Searching tickets with JQL: {jql}")
-    tickets = jira_api.search_issues(jql=jql)
-    logger.info(f"Found {len(tickets)} tickets")
+    tickets = jira_api.iter_issues(jql=jql, page_size=JIRA_PAGE_SIZE)
     
     # Step 2-3: Process tickets against categories (with Confluence context if available)
     df_results = process_tickets(tickets, category_configs)
@@ -285,4 +298,7 @@ if __name__ == "__main__":
     save_results_to_csv(df_results, output_file)
     
     logger.info("\nTicket categorizer scrum agent flow complete")
-    logger.info(f"Results saved to: {output_file}")
\ No newline at end of file
+    logger.info(f"Results saved to: {output_file}")
+    if get_llm_cache() is not None:
+        logger.info(f"LLM cache statistics: {get_llm_cache().stats()}")
+    logger.info(f"HTTP transport statistics: {api_manager.transport_stats()}")
\ No newline at end of file
@@ -2,33 +2,43 @@
 Ticket Updater Scrum Agent - Fetches Jira tickets based on JQL from database configuration,
 summarizes them using AI agent, and posts the summary as a comment to a specified ticket.
 """
+import argparse
+import asyncio
 import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import List, Dict, Any
-from strands.types.exceptions import StructuredOutputException, MaxTokensReachedException
-from tools.strands_limit_hook import LimitToolCounts
 from pydantic import BaseModel, Field
 from common_utils import (
-    ConfigManager,
-    DatabaseManager,
-    APIClientManager,
-    AgentFactory,
+    get_config_manager,
+    get_db_manager,
+    get_api_manager,
+    call_agent,
+    get_llm_cache,
+    set_llm_concurrency,
     setup_logging,
-    OLLAMA_MAX_TOKENS
+    truncate_tokens,
+    count_tokens,
+    chunk_token_budget,
+    tree_summarize,
+    LLM_MAX_CONCURRENCY,
+    OLLAMA_MAX_TOKENS,
+    JIRA_PAGE_SIZE
 )
 
 # Constants
-MAX_DESCRIPTION_LENGTH = 2048
+MAX_DESCRIPTION_TOKENS = 512
 MAX_TOOL_COUNTS = {"sleep": 3}
-CHAR_SPLITTER = 3800  # max number of characters for context window
+CONFIG_CONCURRENCY = 1  # comment configurations processed concurrently
 
 # Setup logging
 logger = setup_logging(__name__)
 
 # Initialize managers
-config_manager = ConfigManager()
-db_manager = DatabaseManager(config_manager)
-api_manager = APIClientManager(config_manager)
+# Initialized lazily: Vault and the database are contacted on first use
+config_manager = get_config_manager()
+db_manager = get_db_manager()
+api_manager = get_api_manager()
 
 
 class TicketSummary(BaseModel):
@@ -41,18 +51,20 @@ class TicketSummary(BaseModel):
     status_breakdown: str = Field(description="Breakdown of ticket statuses")
 
 
-def trim_ticket_description(ticket: Dict[str, Any], max_length: int = MAX_DESCRIPTION_LENGTH) -> None:
+def trim_ticket_description(ticket: Dict[str, Any], max_tokens: int = MAX_DESCRIPTION_TOKENS) -> None:
     """
     Trim ticket description to fit context window.
     
     Args:
         ticket: Jira ticket dictionary
-        max_length: Maximum description length
+        max_tokens: Maximum description length in tokens
     """
     description = ticket.get('fields', {}).get('description')
-    if description and len(description) > max_length:
-        ticket['fields']['description'] = description[:max_length]
-        logger.debug(f"Trimmed description for {ticket['key']} to {max_length} characters")
+    if description:
+        trimmed = truncate_tokens(description, max_tokens)
+        if trimmed != description:
+            ticket['fields']['description'] = trimmed
+            logger.debug(f"Trimmed description for {ticket['key']} to {max_tokens} tokens")
 
 
 def extract_ticket_info(ticket: Dict[str, Any]) -> Dict[str, Any]:
@@ -106,7 +118,11 @@ def fetch_tickets_by_jql(jql: str) -> List[Dict[str, Any]]:
     """
     logger.info(f"Fetching tickets with JQL: {jql}")
     jira_api = api_manager.get_jira_api()
-    tickets = jira_api.search_issues(jql=jql)
+    tickets = []
+    for ticket in jira_api.iter_issues(jql=jql, page_size=JIRA_PAGE_SIZE):
+        # Trim while streaming so large result sets never hold full descriptions
+        trim_ticket_description(ticket)
+        tickets.append(ticket)
     logger.info(f"Found {len(tickets)} tickets")
     return tickets
 
@@ -122,9 +138,7 @@ def call_scrum_agent_for_summary(message: str) -> str:
         Agent response as string
     """
     logger.debug("Calling scrum agent for summary")
-    agent = AgentFactory.create_scrum_agent()
-    agent_result = agent(message)
-    return agent_result.message['content'][0]['text']
+    return call_agent(message, role='scrum')
 
 
 def recursive_ticket_summary(ticket_infos: List[Dict[str, Any]]) -> str:
@@ -143,50 +157,31 @@ def recursive_ticket_summary(ticket_infos: List[Dict[str, Any]]) -> str:
     # Convert ticket infos to string representation
     ticket_strings = [json.dumps(info, indent=2) for info in ticket_infos]
     
-    summaries = []
-    current_chunk = ""
-    
-    for ticket_str in ticket_strings:
-        # If adding this ticket would exceed the limit, summarize current chunk first
-        if len(current_chunk) + len(ticket_str) > CHAR_SPLITTER:
-            if current_chunk:
-                prompt = (
-                    "Create a concise summary (max 500 characters) of the following Jira tickets, "
-                    "highlighting key points, status, and main focus areas:\n\n"
-                    f"{current_chunk}"
-                )
-                chunk_summary = call_scrum_agent_for_summary(prompt)
-                summaries.append(chunk_summary)
-                current_chunk = ""
-        
-        current_chunk += ticket_str + "\n"
-    
-    # Summarize remaining chunk
-    if current_chunk:
+    def summarize_chunk(chunk: str) -> str:
         prompt = (
             "Create a concise summary (max 500 characters) of the following Jira tickets, "
             "highlighting key points, status, and main focus areas:\n\n"
-            f"{current_chunk}"
+            f"{chunk}"
         )
-        chunk_summary = call_scrum_agent_for_summary(prompt)
-        summaries.append(chunk_summary)
-    
-    # If we have multiple summaries, combine them
-    if len(summaries) > 1:
-        combined = "\n\n".join(summaries)
-        if len(combined) > CHAR_SPLITTER:
-            # Recursively summarize the summaries
-            prompt = (
-                "Combine and summarize the following ticket summaries into one cohesive summary "
-                "(max 500 characters):\n\n"
-                f"{combined}"
-            )
-            return call_scrum_agent_for_summary(prompt)
-        return combined
-    elif summaries:
-        return summaries[0]
-    else:
-        return "No tickets to summarize"
+        return call_scrum_agent_for_summary(prompt)
+    
+    def combine_summaries(combined: str) -> str:
+        prompt = (
+            "Combine and summarize the following ticket summaries into one cohesive summary "
+            "(max 500 characters):\n\n"
+            f"{combined}"
+        )
+        return call_scrum_agent_for_summary(prompt)
+    
+    # Summaries that fit into one chunk are returned joined, without another call
+    summary = tree_summarize(
+        ticket_strings,
+        summarize=summarize_chunk,
+        merge=combine_summaries,
+        separator="\n\n",
+        merge_final=False
+    )
+    return summary or "No tickets to summarize"
 
 
 def summarize_tickets_with_agent(tickets: List[Dict[str, Any]], context: str = "") -> TicketSummary:
@@ -215,11 +210,11 @@ def summarize_tickets_with_agent(tickets: List[Dict[str, Any]], context: str = "
         ticket_infos.append(info)
     
     # Calculate total size
-    total_size = sum(len(json.dumps(info)) for info in ticket_infos)
-    logger.info(f"Total ticket data size: {total_size} characters")
+    total_size = sum(count_tokens(json.dumps(info)) for info in ticket_infos)
+    logger.info(f"Total ticket data size: {total_size} tokens")
     
     # If total size exceeds limit, use recursive summarization
-    if total_size > CHAR_SPLITTER:
+    if total_size > chunk_token_budget():
         logger.info("Ticket data exceeds context window, using recursive summarization")
         pre_summary = recursive_ticket_summary(ticket_infos)
         
@@ -279,20 +274,17 @@ def summarize_tickets_with_agent(tickets: List[Dict[str, Any]], context: str = "
         DO NOT include anything else in your answer apart from valid JSON for the given pydantic schema.
         """
     
-    # Create LLM and agent
-    llm = AgentFactory.create_ollama_model(max_tokens=OLLAMA_MAX_TOKENS)
-    limit_hook = LimitToolCounts(max_tool_counts=MAX_TOOL_COUNTS)
-    agent = AgentFactory.create_scrum_agent(model=llm, hooks=[limit_hook])
-    
-    # Execute agent
-    response = agent(
+    # Execute pooled agent, reusing cached responses for identical prompts
+    summary = call_agent(
         prompt,
+        role='scrum',
         structured_output_model=TicketSummary,
-        hooks=[limit_hook]
+        max_tokens=OLLAMA_MAX_TOKENS,
+        max_tool_counts=MAX_TOOL_COUNTS
     )
     
     logger.info("Successfully summarized tickets")
-    return response.structured_output
+    return summary
 
 
 def format_summary_comment(summary: TicketSummary, jql: str) -> str:
@@ -342,10 +334,42 @@ def post_comment_to_ticket(ticket_key: str, comment: str) -> None:
     logger.info(f"Successfully posted comment to {ticket_key}")
     
 
+async def fetch_ticket_descriptions(ticket_keys: List[str]) -> Dict[str, str]:
+    """
+    Fetch the descriptions of Jira tickets concurrently.
+    
+    Args:
+        ticket_keys: Keys of the tickets to fetch
+        
+    Returns:
+        Dictionary mapping ticket keys to their descriptions; tickets that
+        could not be fetched or have no description are left out
+    """
+    async with api_manager.create_async_jira_api() as jira_api:
+        results = await asyncio.gather(
+            *(jira_api.get_issue(key, fields="description") for key in ticket_keys),
+            return_exceptions=True
+        )
+    
+    descriptions = {}
+    for key, result in zip(ticket_keys, results):
+        if isinstance(result, Exception):
+            logger.error(f"Failed to fetch ticket {key} from Jira: {result}")
+            continue
+        description = result.get('fields', {}).get('description', '')
+        if description:
+            descriptions[key] = description
+            logger.info(f"Using ticket description as context for {key}")
+        else:
+            logger.warning(f"No description found for {key}")
+    return descriptions
+
+
 def load_comment_configs() -> List[Dict[str, Any]]:
     """
     Load comment configurations from database.
     If context is empty, fetch the target ticket's description from Jira API.
+    Missing descriptions are fetched concurrently over one event loop.
     
     Returns:
         List of comment configurations with target_ticket, source_jql, and context.
@@ -357,32 +381,20 @@ def load_comment_configs() -> List[Dict[str, Any]]:
     """
     rows = db_manager.execute_query(query)
     
-    jira_api = api_manager.get_jira_api()
-    configs = []
+    # If context is empty, fetch target ticket description from Jira
+    missing = sorted({row[0] for row in rows if not row[2]})
+    descriptions = {}
+    if missing:
+        logger.info(f"Context empty for {len(missing)} tickets, fetching ticket descriptions from Jira")
+        descriptions = asyncio.run(fetch_ticket_descriptions(missing))
     
+    configs = []
     for row in rows:
         target_ticket = row[0]
-        source_jql = row[1]
-        context = row[2] if row[2] else ""
-        
-        # If context is empty, fetch target ticket description from Jira
-        if not context:
-            try:
-                logger.info(f"Context empty for {target_ticket}, fetching ticket description from Jira")
-                ticket = jira_api.get_issue(target_ticket)
-                description = ticket.get('fields', {}).get('description', '')
-                if description:
-                    context = description
-                    logger.info(f"Using ticket description as context for {target_ticket}")
-                else:
-                    logger.warning(f"No description found for {target_ticket}")
-            except Exception as e:
-                logger.error(f"Failed to fetch ticket {target_ticket} from Jira: {e}")
-        
         configs.append({
             "target_ticket": target_ticket,
-            "source_jql": source_jql,
-            "context": context
+            "source_jql": row[1],
+            "context": row[2] if row[2] else descriptions.get(target_ticket, "")
         })
     
     logger.info(f"Loaded {len(configs)} comment configurations")
@@ -405,6 +417,8 @@ def process_comment_config(config: Dict[str, Any]) -> bool:
     
     logger.info(f"Processing comment config for ticket {target_ticket}")
     logger.info(f"JQL: {source_jql}")
+    # Imported here, strands is only loaded once a summary is requested
+    from strands.types.exceptions import StructuredOutputException, MaxTokensReachedException
     
     try:
         # Fetch tickets
@@ -437,7 +451,16 @@ def process_comment_config(config: Dict[str, Any]) -> bool:
         return False
 
 
-if __name__ == "__main__":
+def run(concurrency: int = CONFIG_CONCURRENCY) -> Dict[str, int]:
+    """
+    Run the ticket updater flow for all comment configurations.
+    
+    Args:
+        concurrency: Number of configurations processed concurrently
+        
+    Returns:
+        Overall statistics
+    """
     logger.info("Starting ticket updater scrum agent flow")
     
     # Load configurations from database
@@ -445,21 +468,45 @@ if __name__ == "__main__":
     
     if not configs:
         logger.warning("No comment configurations found in database")
-        exit(0)
+        return {'total': 0, 'successful': 0, 'failed': 0}
     
-    # Process each configuration
-    total = len(configs)
-    successful = 0
-    failed = 0
+    # Process configurations, LLM calls are additionally capped by --llm-concurrency if set
+    with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="comment-config") as executor:
+        results = list(executor.map(process_comment_config, configs))
     
-    for config in configs:
-        if process_comment_config(config):
-            successful += 1
-        else:
-            failed += 1
+    stats = {
+        'total': len(configs),
+        'successful': results.count(True),
+        'failed': results.count(False)
+    }
     
     # Log summary
     logger.info("Ticket updater scrum agent flow complete")
-    logger.info(f"Total configurations: {total}")
-    logger.info(f"Successful: {successful}")
-    logger.info(f"Failed: {failed}")
+    logger.info(f"Total configurations: {stats['total']}")
+    logger.info(f"Successful: {stats['successful']}")
+    logger.info(f"Failed: {stats['failed']}")
+    if get_llm_cache() is not None:
+        logger.info(f"LLM cache statistics: {get_llm_cache().stats()}")
+    logger.info(f"HTTP transport statistics: {api_manager.transport_stats()}")
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarize Jira tickets and post the summaries as comments.")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=CONFIG_CONCURRENCY,
+        help=f"number of comment configurations processed concurrently (default: {CONFIG_CONCURRENCY})"
+    )
+    parser.add_argument(
+        "--llm-concurrency",
+        type=int,
+        default=LLM_MAX_CONCURRENCY,
+        help="maximum in-flight LLM calls of the process, 0 leaves it to the worker settings "
+             f"(default: {LLM_MAX_CONCURRENCY})"
+    )
+    args = parser.parse_args()
+    set_llm_concurrency(args.llm_concurrency)
+    
+    run(concurrency=args.concurrency)
@@ -1,41 +1,21 @@
-import os
 import logging
-import hvac
 from strands import tool
-from dotenv import load_dotenv
-from connectors.jirapi import JiraApi
 
 log = logging.getLogger(__name__)
 log.setLevel(logging.DEBUG)
 log.addHandler(logging.StreamHandler())
-load_dotenv()
 
-client = hvac.Client(url=os.getenv('VAULT_URL'))
-client.auth.approle.login(
-    role_id=os.getenv('VAULT_ROLE_ID'),
-    secret_id=os.getenv('VAULT_SECRET_ID'),
-)
 
-db_secret = client.secrets.kv.read_secret_version(path='secret/cmdb')
-
-DB_NAME = db_secret['data']['data']['psql_db']
-DB_USER = db_secret['data']['data']['psql_user']
-DB_PASSWORD = db_secret['data']['data']['psql_pw']
-DB_HOST = db_secret['data']['data']['psql_host']
-DB_PORT = db_secret['data']['data']['psql_port']
-
-jira_secret = client.secrets.kv.read_secret_version(path="secret/jira")
-
-jira_api = JiraApi(
-    hostname=jira_secret["data"]["data"]["url"],
-    auth_token=jira_secret["data"]["data"]["token"],
-)
+def get_jira_api():
+    """Jira client shared with the flows; Vault is contacted on the first tool call."""
+    from common_utils import get_api_manager
+    return get_api_manager().get_jira_api()
 
 @tool
 def search_issues (jql):
     log.info (f"search_issues was called with following query {jql}")
     results = []
-    tickets = jira_api.search_issues(jql=jql)
+    tickets = get_jira_api().search_issues(jql=jql)
     for ticket in tickets:
         results.append (
             {
@@ -78,7 +58,7 @@ def create_jira_issue(project_key: str, summary: str, description: str, issue_ty
         ],
     }
     try:
-        result = jira_api.create_issue(
+        result = get_jira_api().create_issue(
             project_key=project_key,
             summary=summary,
             description=formatted_description, # Pass the formatted description
@@ -107,7 +87,7 @@ def update_jira_issue(issue_key: str, fields: dict):
     """
     log.info(f"update_jira_issue called for issue '{issue_key}' with fields: {fields}")
     try:
-        success = jira_api.update_issue(issue_key=issue_key, fields=fields)
+        success = get_jira_api().update_issue(issue_key=issue_key, fields=fields)
         log.info(f"Jira issue '{issue_key}' updated successfully: {success}")
         return success
     except Exception as e:
@@ -129,7 +109,7 @@ def add_jira_comment(issue_key: str, comment_body: str):
     log.info(f"add_jira_comment called for issue '{issue_key}'")
     try:
         # The JiraApi.add_comment method handles formatting the comment_body string.
-        result = jira_api.add_comment(issue_key=issue_key, comment_body=comment_body)
+        result = get_jira_api().add_comment(issue_key=issue_key, comment_body=comment_body)
         log.info(f"Comment added successfully to Jira issue '{issue_key}'. Comment ID: {result.get('id')}")
         return result
     except Exception as e:
@@ -150,7 +130,7 @@ def resolve_jira_issue(issue_key: str, resolution_name: str = "Fixed"):
     """
     log.info(f"resolve_jira_issue called for issue '{issue_key}' with resolution '{resolution_name}'")
     try:
-        success = jira_api.resolve_issue(issue_key=issue_key, resolution_name=resolution_name)
+        success = get_jira_api().resolve_issue(issue_key=issue_key, resolution_name=resolution_name)
         log.info(f"Jira issue '{issue_key}' resolved successfully: {success}")
         return success
     except Exception as e:
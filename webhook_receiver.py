@@ -0,0 +1,348 @@
+"""
+Webhook Receiver - Ingests Jira tickets as soon as they are created or updated.
+Receives Jira issue webhooks, debounces them per ticket key and analyzes only
+the affected tickets of the matching projects.
+"""
+import argparse
+import hmac
+import json
+import os
+import re
+import signal
+import threading
+import time
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Set
+from urllib.parse import parse_qs
+
+from common_utils import (
+    get_db_manager,
+    get_api_manager,
+    set_llm_concurrency,
+    setup_logging,
+    JIRA_PAGE_SIZE,
+    LLM_MAX_CONCURRENCY
+)
+from ingest_tickets_with_scrum_agent import (
+    analyze_tickets,
+    load_items,
+    restrict_to_keys,
+    ANALYSIS_WORKERS
+)
+
+# Constants
+WEBHOOK_HOST = os.getenv('WEBHOOK_HOST', '0.0.0.0')
+WEBHOOK_PORT = int(os.getenv('WEBHOOK_PORT', 8080))
+WEBHOOK_PATH = '/webhook'
+WEBHOOK_SECRET = os.getenv('WEBHOOK_SECRET')  # expected in the 'secret' query parameter
+WEBHOOK_EVENTS = {'jira:issue_created', 'jira:issue_updated'}
+DEBOUNCE_SECONDS = 30.0  # quiet period after the last event of a ticket
+DEBOUNCE_MAX_WAIT = 300.0  # a ticket updated continuously is processed after at most this long
+MAX_KEYS_PER_SEARCH = 50  # keys per 'key in (...)' search
+ITEMS_TTL = 600  # seconds project items are reused before reloading them
+MAX_PAYLOAD_BYTES = 10 * 1024 * 1024
+ISSUE_KEY_PATTERN = re.compile(r'^[A-Z][A-Z0-9_]*-[0-9]+$')
+
+# Setup logging
+logger = setup_logging(__name__)
+
+
+class Debouncer:
+    """
+    Collects ticket keys and releases each one after a quiet period.
+
+    Every event of a key postpones it by delay seconds, but never beyond
+    max_wait seconds after its first pending event, so bursts of updates
+    to one ticket lead to a single analysis.
+    """
+
+    def __init__(self, delay: float = DEBOUNCE_SECONDS, max_wait: float = DEBOUNCE_MAX_WAIT):
+        """
+        Initialize debouncer.
+
+        Args:
+            delay: Seconds without events before a key is released
+            max_wait: Maximum seconds a key is held back
+        """
+        self.delay = delay
+        self.max_wait = max_wait
+        # key -> (first event, release time)
+        self._pending = {}
+        self._cond = threading.Condition()
+        self._closed = False
+
+    def add(self, key: str) -> None:
+        """Register an event for a ticket key."""
+        now = time.monotonic()
+        with self._cond:
+            first = self._pending.get(key, (now, None))[0]
+            self._pending[key] = (first, min(now + self.delay, first + self.max_wait))
+            self._cond.notify()
+
+    def pending(self) -> int:
+        """Return the number of keys waiting to be released."""
+        with self._cond:
+            return len(self._pending)
+
+    def take_due(self) -> Optional[Set[str]]:
+        """
+        Block until at least one key is due and remove all due keys.
+
+        Returns:
+            Due keys, or None once the debouncer is closed
+        """
+        with self._cond:
+            while not self._closed:
+                now = time.monotonic()
+                due = {key for key, (_, release) in self._pending.items() if release <= now}
+                if due:
+                    for key in due:
+                        del self._pending[key]
+                    return due
+                timeout = min((release for _, release in self._pending.values()), default=now + 60) - now
+                self._cond.wait(timeout)
+            return None
+
+    def close(self) -> None:
+        """Release the consumer; keys still pending are dropped."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+class TicketIngestor:
+    """Analyzes debounced tickets for every project whose JQL matches them."""
+
+    def __init__(self, debouncer: Debouncer, workers: int = ANALYSIS_WORKERS):
+        """
+        Initialize ingestor.
+
+        Args:
+            debouncer: Source of due ticket keys
+            workers: Number of tickets analyzed concurrently per project
+        """
+        self.debouncer = debouncer
+        self.workers = workers
+        self._items = None
+        self._items_loaded = 0.0
+        self._thread = threading.Thread(target=self._run, name="webhook-ingest")
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def join(self) -> None:
+        self._thread.join()
+
+    def get_items(self) -> List[Dict[str, Any]]:
+        """Return the project items, reloading them every ITEMS_TTL seconds."""
+        if self._items is None or time.monotonic() - self._items_loaded > ITEMS_TTL:
+            self._items = load_items()
+            self._items_loaded = time.monotonic()
+        return self._items
+
+    def _run(self) -> None:
+        """Process due keys until the debouncer is closed."""
+        while True:
+            keys = self.debouncer.take_due()
+            if keys is None:
+                return
+            try:
+                self.process_keys(keys)
+            except Exception as e:
+                logger.error(f"Failed to process webhook tickets {sorted(keys)}: {e}")
+
+    def process_keys(self, keys: Set[str]) -> Dict[str, int]:
+        """
+        Analyze the given tickets in every project they belong to.
+
+        Project membership is decided by Jira, by restricting the project's
+        sprint and summary JQL to the keys. Unchanged tickets are skipped by
+        the fingerprint check of the ingestion flow.
+
+        Args:
+            keys: Jira ticket keys
+
+        Returns:
+            Dictionary with processing statistics
+        """
+        logger.info(f"Processing {len(keys)} tickets from webhooks")
+        counts = {'processed': 0, 'skipped': 0, 'failed': 0}
+
+        for item in self.get_items():
+            tickets = self.search_tickets(item, keys)
+            if not tickets:
+                continue
+
+            logger.info(f"{len(tickets)} webhook tickets match project {item['title']}")
+            try:
+                for ticket, result, _ in analyze_tickets(item, tickets, workers=self.workers):
+                    counts[result] += 1
+            except Exception as e:
+                # Other projects are still processed
+                logger.error(f"Failed to process webhook tickets of project {item['title']}: {e}")
+
+        logger.info(f"Webhook tickets complete: {counts}")
+        return counts
+
+    def search_tickets(self, item: Dict[str, Any], keys: Set[str]) -> List[Dict[str, Any]]:
+        """
+        Find which of the given tickets match a project's sprint or summary JQL.
+
+        Webhooks fire for every Jira project, so keys may be unknown or not
+        visible to the service account, or the issue may have been deleted
+        meanwhile. The searches run with validateQuery=warn, so Jira ignores
+        such keys instead of rejecting the whole search. A failed search only
+        loses its own batch.
+
+        Args:
+            item: Project item configuration
+            keys: Jira ticket keys
+
+        Returns:
+            Matching Jira ticket dictionaries
+        """
+        jira_api = get_api_manager().get_jira_api()
+        sorted_keys = sorted(keys)
+        tickets = []
+        for start in range(0, len(sorted_keys), MAX_KEYS_PER_SEARCH):
+            batch = sorted_keys[start:start + MAX_KEYS_PER_SEARCH]
+            for jql in (item['sprint_jql'], item['jql']):
+                try:
+                    tickets.extend(jira_api.iter_issues(
+                        jql=restrict_to_keys(jql, batch),
+                        page_size=JIRA_PAGE_SIZE,
+                        validate_query="warn"
+                    ))
+                except Exception as e:
+                    logger.error(f"Failed to search webhook tickets {batch} for project {item['title']}: {e}")
+        return tickets
+
+    def close(self) -> None:
+        """Stop consuming keys and wait for the current batch."""
+        self.debouncer.close()
+        self.join()
+
+
+def parse_event(payload: Dict[str, Any]) -> Optional[str]:
+    """
+    Extract the ticket key from a Jira webhook payload.
+
+    Args:
+        payload: Decoded webhook body
+
+    Returns:
+        Ticket key of an issue created or updated event, None otherwise
+    """
+    if payload.get('webhookEvent') not in WEBHOOK_EVENTS:
+        return None
+    key = (payload.get('issue') or {}).get('key')
+    # Keys end up in JQL, accept nothing but well-formed keys
+    if not isinstance(key, str) or not ISSUE_KEY_PATTERN.match(key):
+        logger.warning(f"Ignoring webhook with invalid issue key: {key!r}")
+        return None
+    return key
+
+
+class WebhookHandler(BaseHTTPRequestHandler):
+    """Accepts Jira webhooks and hands their ticket keys to the debouncer."""
+
+    debouncer: Debouncer = None
+
+    def _respond(self, status: HTTPStatus, body: Dict[str, Any]) -> None:
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _authorized(self, query: str) -> bool:
+        if not WEBHOOK_SECRET:
+            return True
+        secret = parse_qs(query).get('secret', [''])[0]
+        # Compared as bytes, compare_digest rejects non-ASCII str
+        return hmac.compare_digest(secret.encode('utf-8'), WEBHOOK_SECRET.encode('utf-8'))
+
+    def do_GET(self) -> None:
+        if self.path == '/health':
+            self._respond(HTTPStatus.OK, {'status': 'ok', 'pending': self.debouncer.pending()})
+        else:
+            self._respond(HTTPStatus.NOT_FOUND, {'error': 'not found'})
+
+    def do_POST(self) -> None:
+        path, _, query = self.path.partition('?')
+        if path != WEBHOOK_PATH:
+            self._respond(HTTPStatus.NOT_FOUND, {'error': 'not found'})
+            return
+        if not self._authorized(query):
+            self._respond(HTTPStatus.FORBIDDEN, {'error': 'forbidden'})
+            return
+
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > MAX_PAYLOAD_BYTES:
+            self._respond(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {'error': 'payload too large'})
+            return
+        try:
+            payload = json.loads(self.rfile.read(length))
+        except (ValueError, UnicodeDecodeError):
+            self._respond(HTTPStatus.BAD_REQUEST, {'error': 'invalid json'})
+            return
+
+        key = parse_event(payload) if isinstance(payload, dict) else None
+        if key is None:
+            self._respond(HTTPStatus.OK, {'status': 'ignored'})
+            return
+
+        logger.debug(f"Received {payload['webhookEvent']} for {key}")
+        self.debouncer.add(key)
+        self._respond(HTTPStatus.ACCEPTED, {'status': 'queued', 'key': key})
+
+    def log_message(self, format: str, *args) -> None:
+        logger.debug(f"{self.address_string()} - {format % args}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Receive Jira webhooks and ingest the affected tickets.")
+    parser.add_argument("--host", default=WEBHOOK_HOST, help=f"address to listen on (default: {WEBHOOK_HOST})")
+    parser.add_argument("--port", type=int, default=WEBHOOK_PORT, help=f"port to listen on (default: {WEBHOOK_PORT})")
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        default=DEBOUNCE_SECONDS,
+        help=f"seconds without events before a ticket is analyzed (default: {DEBOUNCE_SECONDS})"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=ANALYSIS_WORKERS,
+        help=f"number of tickets analyzed concurrently (default: {ANALYSIS_WORKERS})"
+    )
+    parser.add_argument(
+        "--llm-concurrency",
+        type=int,
+        default=LLM_MAX_CONCURRENCY,
+        help="maximum in-flight LLM calls of the process, 0 leaves it to the worker settings "
+             f"(default: {LLM_MAX_CONCURRENCY})"
+    )
+    args = parser.parse_args()
+    set_llm_concurrency(args.llm_concurrency)
+
+    debouncer = Debouncer(delay=args.debounce, max_wait=max(args.debounce, DEBOUNCE_MAX_WAIT))
+    ingestor = TicketIngestor(debouncer, workers=args.workers)
+    WebhookHandler.debouncer = debouncer
+    server = ThreadingHTTPServer((args.host, args.port), WebhookHandler)
+
+    # serve_forever returns once shutdown is called from another thread
+    signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=server.shutdown).start())
+    ingestor.start()
+    logger.info(f"Listening for Jira webhooks on {args.host}:{args.port}{WEBHOOK_PATH}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        ingestor.close()
+        get_db_manager().close()
+        logger.info("Webhook receiver stopped")